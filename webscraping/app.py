@@ -7,7 +7,7 @@ Sunucu için optimize edilmiştir.
 import os
 import json
 import csv
-import time
+import argparse
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -16,6 +16,23 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 
+from batch import dedupe_places, load_queries
+from browser import (
+    LIGHTWEIGHT_BROWSER, LIGHTWEIGHT_WINDOW, apply_lightweight_profile, block_heavy_requests
+)
+from driver_pool import DriverPool
+from waits import AdaptiveTimeout, wait_for_feed_growth, wait_for_network_idle
+from extractors import (
+    extract_detailed_data, extract_feed_cards, feed_card_result,
+    fill_missing_fields, needs_detail_page
+)
+
+# Çalışma modları:
+# - list:   sadece liste kartlarındaki veriler (varsayılan, sayfa açılmaz)
+# - hybrid: telefonu veya websitesi kartta olmayan işletmelerin sayfası açılır
+# - detail: her işletmenin sayfası açılır
+SCRAPE_MODES = ('list', 'hybrid', 'detail')
+
 
 def get_chrome_driver():
     """
@@ -25,7 +42,8 @@ def get_chrome_driver():
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--start-maximized")
-    chrome_options.add_argument("--window-size=1920,1080")
+    width, height = LIGHTWEIGHT_WINDOW if LIGHTWEIGHT_BROWSER else (1920, 1080)
+    chrome_options.add_argument(f"--window-size={width},{height}")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
@@ -33,6 +51,10 @@ def get_chrome_driver():
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
     chrome_options.add_argument("--remote-debugging-port=9222")
     
+    # Hafif profil: görsel, font, medya ve harita karoları indirilmez
+    if LIGHTWEIGHT_BROWSER:
+        apply_lightweight_profile(chrome_options)
+    
     # Linux sunucu için ChromeDriver yolu
     linux_chromedriver_path = '/usr/bin/chromedriver'
     
@@ -50,15 +72,50 @@ def get_chrome_driver():
             # Sistem PATH'inden Chrome kullan
             driver = webdriver.Chrome(options=chrome_options)
     
+    if LIGHTWEIGHT_BROWSER:
+        block_heavy_requests(driver)
+    
     return driver
 
 
-def scrape_google_maps(url):
+# Aynı süreçteki aramalar tek bir tarayıcıyı paylaşır
+# (sabit remote-debugging-port nedeniyle havuz tek sürücülüdür)
+driver_pool = DriverPool(
+    get_chrome_driver,
+    max_size=1,
+    max_age=int(os.getenv('DRIVER_MAX_AGE', 1800)),
+    max_jobs=int(os.getenv('DRIVER_MAX_JOBS', 50))
+)
+
+
+def enrich_with_details(driver, cards, mode):
+    """
+    Kart kayıtlarını işletme sayfalarından alınan detaylarla tamamlar.
+    hybrid modda sadece telefonu veya websitesi eksik kartların sayfası açılır.
+    """
+    results = []
+    for card in cards:
+        result = feed_card_result(card, card['sira'])
+        if mode == 'detail' or needs_detail_page(result):
+            print(f"Detay çekiliyor: {card['isim']}")
+            try:
+                driver.get(card['link'])
+                detail = extract_detailed_data(driver, card['sira'], card['link'])
+                if detail['isim']:
+                    result = fill_missing_fields(detail, result)
+            except Exception as e:
+                print(f"Detay hatası (kayıt {card['sira']}): {str(e)}")
+        results.append(result)
+    return results
+
+
+def scrape_google_maps(url, mode='list'):
     """
     Google Maps'ten işletme verilerini çeker.
     
     Args:
         url: Google Maps arama URL'si
+        mode: 'list', 'hybrid' veya 'detail'
         
     Returns:
         list: İşletme bilgileri listesi
@@ -66,10 +123,9 @@ def scrape_google_maps(url):
     driver = None
     
     try:
-        driver = get_chrome_driver()
+        driver = driver_pool.acquire()
         print("Google Maps açılıyor...")
         driver.get(url)
-        time.sleep(5)
         
         # Çerez popup'ını kabul et (varsa)
         try:
@@ -77,7 +133,6 @@ def scrape_google_maps(url):
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Kabul')]"))
             )
             accept_button.click()
-            time.sleep(2)
         except Exception:
             print("Çerez popup'ı bulunamadı veya zaten kabul edilmiş.")
         
@@ -90,118 +145,36 @@ def scrape_google_maps(url):
         print("Sonuçlar yükleniyor...")
         scrollable_div = driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
         
-        last_height = 0
         scroll_count = 0
         max_scrolls = 20
+        card_count = 0
+        scroll_timeout = AdaptiveTimeout(initial=4, minimum=1, maximum=10)
         
         while scroll_count < max_scrolls:
             driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_div)
-            time.sleep(2)
+            growth = wait_for_feed_growth(driver, scrollable_div, card_count, scroll_timeout.current)
+            scroll_timeout.record(growth['elapsed'], growth['timed_out'])
+            card_count = growth['count']
             
-            new_height = driver.execute_script("return arguments[0].scrollHeight", scrollable_div)
-            if new_height == last_height:
-                try:
-                    driver.find_element(By.XPATH, "//*[contains(text(), 'listenin sonuna ulaştınız')]")
-                    print("Listenin sonuna ulaşıldı.")
-                    break
-                except Exception:
-                    pass
+            if growth['end']:
+                print("Listenin sonuna ulaşıldı.")
+                break
             
-            last_height = new_height
             scroll_count += 1
             print(f"Scroll: {scroll_count}")
         
-        # Tüm işletmeleri bul
-        time.sleep(2)
-        places = driver.find_elements(By.CSS_SELECTOR, "div.Nv2PK")
+        # Kartların son istekleri tamamlansın
+        wait_for_network_idle(driver)
+        results = extract_feed_cards(driver, scrollable_div)
         
-        print(f"\n{len(places)} işletme bulundu!\n")
+        print(f"\n{len(results)} işletme bulundu!\n")
         
-        results = []
+        for result in results:
+            print(f"{result['sira']}. {result['isim']} - Puan: {result['puan']} "
+                  f"({result['degerlendirme_sayisi']} değerlendirme)")
         
-        for i, place in enumerate(places, 1):
-            try:
-                # İşletme adı
-                name = ""
-                try:
-                    name_element = place.find_element(By.CSS_SELECTOR, "div.qBF1Pd")
-                    name = name_element.text
-                except Exception:
-                    pass
-                
-                # Puan
-                rating = ""
-                try:
-                    rating_element = place.find_element(By.CSS_SELECTOR, "span.MW4etd")
-                    rating = rating_element.text
-                except Exception:
-                    pass
-                
-                # Değerlendirme sayısı
-                reviews = ""
-                try:
-                    reviews_element = place.find_element(By.CSS_SELECTOR, "span.UY7F9")
-                    reviews = reviews_element.text.replace("(", "").replace(")", "")
-                except Exception:
-                    pass
-                
-                # Kategori/Tür
-                category = ""
-                try:
-                    category_elements = place.find_elements(By.CSS_SELECTOR, "div.W4Efsd span")
-                    for elem in category_elements:
-                        text = elem.text
-                        if text and "·" not in text and not text.startswith("("):
-                            category = text
-                            break
-                except Exception:
-                    pass
-                
-                # Adres
-                address = ""
-                try:
-                    address_elements = place.find_elements(By.CSS_SELECTOR, "div.W4Efsd")
-                    for elem in address_elements:
-                        text = elem.text
-                        if "İstanbul" in text or any(char.isdigit() for char in text):
-                            address = text.split("·")[-1].strip() if "·" in text else text
-                            break
-                except Exception:
-                    pass
-                
-                # Çalışma saatleri
-                hours = ""
-                try:
-                    hours_element = place.find_element(By.CSS_SELECTOR, "span.ZDu9vd span")
-                    hours = hours_element.text
-                except Exception:
-                    pass
-                
-                # Link
-                link = ""
-                try:
-                    link_element = place.find_element(By.CSS_SELECTOR, "a.hfpxzc")
-                    link = link_element.get_attribute("href")
-                except Exception:
-                    pass
-                
-                if name:
-                    result = {
-                        "sira": i,
-                        "isim": name,
-                        "puan": rating,
-                        "degerlendirme_sayisi": reviews,
-                        "kategori": category,
-                        "adres": address,
-                        "calisma_saati": hours,
-                        "link": link
-                    }
-                    results.append(result)
-                    print(f"{i}. {name} - Puan: {rating} ({reviews} değerlendirme)")
-                    
-            except Exception as e:
-                print(f"Hata (kayıt {i}): {str(e)}")
-                continue
+        if mode != 'list':
+            results = enrich_with_details(driver, results, mode)
         
         return results
         
@@ -210,8 +183,22 @@ def scrape_google_maps(url):
         return []
         
     finally:
-        if driver:
-            driver.quit()
+        driver_pool.release(driver)
+
+
+def scrape_queries(queries, mode='list'):
+    """
+    Sorgu listesindeki her (lokasyon, meslek) çifti için arama yapar ve
+    sonuçları işletme kimliğine göre tekilleştirerek tek listede birleştirir.
+    """
+    def all_results():
+        for i, (location, profession) in enumerate(queries, 1):
+            print(f"\n[{i}/{len(queries)}] {location} - {profession}")
+            search_query = f"{location} {profession}"
+            url = f"https://www.google.com/maps/search/{search_query.replace(' ', '+')}/"
+            yield from scrape_google_maps(url, mode)
+
+    return list(dedupe_places(all_results()))
 
 
 def save_to_json(data, filename="berberler.json"):
@@ -242,15 +229,34 @@ def save_to_csv(data, filename="berberler.csv"):
 
 
 if __name__ == "__main__":
-    # Örnek Google Maps URL
-    url = "https://www.google.com/maps/search/Maltepe+berberler/"
+    parser = argparse.ArgumentParser(description="Google Maps'ten işletme verilerini çeker.")
+    parser.add_argument(
+        "--url", default="https://www.google.com/maps/search/Maltepe+berberler/",
+        help="Google Maps arama URL'si"
+    )
+    parser.add_argument(
+        "--queries",
+        help="Toplu arama: location/profession sütunlu CSV veya JSON sorgu dosyası"
+    )
+    parser.add_argument(
+        "--mode", choices=SCRAPE_MODES, default="list",
+        help="list: sadece liste kartları, hybrid: eksik bilgiler için sayfa aç, detail: her sayfayı aç"
+    )
+    args = parser.parse_args()
     
     print("=" * 60)
     print("GOOGLE MAPS VERİ ÇEKME")
     print("=" * 60)
     
     # Verileri çek
-    data = scrape_google_maps(url)
+    if args.queries:
+        queries = load_queries(args.queries)
+        print(f"{len(queries)} sorgu okundu: {args.queries}")
+        data = scrape_queries(queries, args.mode)
+        json_name, csv_name = "toplu_sonuclar.json", "toplu_sonuclar.csv"
+    else:
+        data = scrape_google_maps(args.url, args.mode)
+        json_name, csv_name = "berberler.json", "berberler.csv"
     
     if data:
         print(f"\n{'=' * 60}")
@@ -258,7 +264,7 @@ if __name__ == "__main__":
         print("=" * 60)
         
         # JSON ve CSV olarak kaydet
-        save_to_json(data)
-        save_to_csv(data)
+        save_to_json(data, json_name)
+        save_to_csv(data, csv_name)
     else:
         print("Veri çekilemedi!")
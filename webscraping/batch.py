@@ -0,0 +1,97 @@
+"""
+Google Maps Scraper - Toplu Arama
+Lokasyon x meslek sorgu listelerini okuyan ve birden fazla aramanın
+sonuçlarını işletme kimliğine göre birleştiren yardımcılar.
+"""
+
+import io
+import os
+import csv
+import json
+
+from places import parse_place_id
+
+
+# CSV başlıklarında kabul edilen sütun adları
+LOCATION_COLUMNS = ('location', 'lokasyon', 'konum')
+PROFESSION_COLUMNS = ('profession', 'meslek')
+
+
+def _pick(row, names):
+    for name in names:
+        value = row.get(name)
+        if value:
+            return value
+    return ''
+
+
+def parse_queries(items):
+    """
+    Sorgu listesini (lokasyon, meslek) çiftlerine çevirir.
+    Öğeler sözlük ({'location': .., 'profession': ..}) veya iki elemanlı
+    liste olabilir. Boş ve tekrar eden çiftler atılır, sıra korunur.
+    """
+    queries = []
+    seen = set()
+    for item in items:
+        if isinstance(item, dict):
+            row = {str(key).strip().lower(): str(value or '').strip() for key, value in item.items()}
+            location, profession = _pick(row, LOCATION_COLUMNS), _pick(row, PROFESSION_COLUMNS)
+        elif isinstance(item, (list, tuple)) and len(item) >= 2:
+            location, profession = str(item[0]).strip(), str(item[1]).strip()
+        else:
+            continue
+
+        key = (' '.join(location.split()).casefold(), ' '.join(profession.split()).casefold())
+        if location and profession and key not in seen:
+            seen.add(key)
+            queries.append((location, profession))
+    return queries
+
+
+def read_queries(text, filename=''):
+    """
+    JSON veya CSV metninden sorguları okur.
+    CSV başlıklı (location/lokasyon, profession/meslek) ya da başlıksız
+    (ilk iki sütun) olabilir; ayraç otomatik bulunur.
+    """
+    text = text.lstrip('\ufeff')
+    if filename.lower().endswith('.json') or text.lstrip().startswith(('[', '{')):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get('queries', [])
+        return parse_queries(data)
+
+    try:
+        dialect = csv.Sniffer().sniff(text[:2048], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    rows = list(csv.reader(io.StringIO(text), dialect))
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    if any(name in header for name in LOCATION_COLUMNS) and any(name in header for name in PROFESSION_COLUMNS):
+        return parse_queries(dict(zip(header, row)) for row in rows[1:])
+    return parse_queries(rows)
+
+
+def load_queries(path):
+    """Sorgu dosyasını (.json veya .csv) okur."""
+    with open(path, encoding='utf-8-sig') as f:
+        return read_queries(f.read(), os.path.basename(path))
+
+
+def dedupe_places(records):
+    """
+    Birden fazla aramanın sonuçlarını birleştiren generator.
+    Aynı işletme (place ID) yalnızca ilk göründüğü haliyle döner ve
+    kayıtlar 1'den başlayarak yeniden numaralanır.
+    """
+    seen = set()
+    for record in records:
+        key = parse_place_id(record.get('link')) or record.get('isim')
+        if key in seen:
+            continue
+        seen.add(key)
+        yield dict(record, sira=len(seen))
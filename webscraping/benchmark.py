@@ -0,0 +1,419 @@
+"""
+Google Maps Scraper - Performans Ölçümü
+Kaydedilmiş Maps sayfası şablonlarını (benchmarks/) yerel bir HTTP sunucusundan
+sunar ve gerçek çıkarma kodunu headless Chrome'da bunlara karşı çalıştırır.
+Aşama süreleri (başlatma, kaydırma, toplama, işletme başına çıkarma, dışa
+aktarma) ölçülür, geçmiş çalıştırmalarla karşılaştırılıp yavaşlamalar raporlanır.
+
+    python benchmark.py                      # tüm aşamalar
+    python benchmark.py --no-browser         # Chrome gerektirmeyen aşamalar
+    python benchmark.py --serve              # sahte Maps sunucusunu elle denemek için
+
+Geçmiş varsayılan olarak benchmarks/history.jsonl dosyasına eklenir.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+import statistics
+import subprocess
+import threading
+from string import Template
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+from urllib.request import urlopen
+
+from exporters import EXCEL_AVAILABLE, build_excel, csv_stream
+from http_engine import parse_place_html
+from phones import analyze_phone_number, analyze_phone_numbers
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BASE_DIR, 'benchmarks')
+HISTORY_FILE = os.path.join(FIXTURES_DIR, 'history.jsonl')
+
+# Sahte işletme linklerindeki kimlik; sunucu hangi sayfanın istendiğini buradan bulur
+PLACE_LINK_RE = re.compile(r'!1s0x14cab([0-9a-f]{6}):')
+
+CATEGORIES = ['Berber', 'Kuaför', 'Eczane', 'Pideci', 'Kafe']
+DISTRICTS = ['Kadıköy', 'Beşiktaş', 'Üsküdar', 'Maltepe']
+PHONE_FORMATS = [
+    '0532 {a:03d} {b:02d} {c:02d}', '(0216) {a:03d} {b:02d} {c:02d}', '+44 20 {a:04d} {b:04d}',
+    '444 {b} {a:03d}', '+90 555 {a:03d} {b:02d} {c:02d}', '',
+]
+DAYS = ['Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma', 'Cumartesi', 'Pazar']
+
+
+def load_template(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return Template(f.read())
+
+
+def script_json(value):
+    """<script> içine gömülecek JSON; </script> kapanışı kaçırılır."""
+    return json.dumps(value, ensure_ascii=False).replace('</', '<\\/')
+
+
+def escape(value):
+    return str(value).replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;')
+
+
+def make_places(count, seed=42):
+    """Her çalıştırmada aynı olan sahte işletme verisi üretir."""
+    rng = random.Random(seed)
+    places = []
+    for i in range(1, count + 1):
+        name = f"Ölçüm {CATEGORIES[i % len(CATEGORIES)]} {i}"
+        phone = PHONE_FORMATS[i % len(PHONE_FORMATS)].format(
+            a=rng.randrange(1000), b=rng.randrange(10, 100), c=rng.randrange(10, 100)
+        )
+        places.append({
+            'index': i,
+            'name': name,
+            'rating': round(rng.uniform(3.0, 5.0), 1),
+            'reviews': rng.randrange(1, 5000),
+            'category': CATEGORIES[i % len(CATEGORIES)],
+            'address': f"Moda Cad. No:{i}, {DISTRICTS[i % len(DISTRICTS)]}/İstanbul",
+            'phone': phone,
+            'website': f"https://olcum{i}.example.com/" if i % 3 else '',
+            'path': f"/maps/place/{quote(name.replace(' ', '+'))}/data=!4m7!3m6!1s0x14cab{i:06x}:0x{i:x}"
+                    f"!8m2!3d41.0!4d29.0!19sChIJolcum{i:06d}",
+        })
+    return places
+
+
+def place_state(place):
+    """http_engine'in okuduğu APP_INITIALIZATION_STATE yapısı."""
+    record = [None] * 179
+    record[4] = [None] * 7 + [place['rating'], place['reviews']]
+    record[7] = [place['website']] if place['website'] else None
+    record[11] = place['name']
+    record[13] = [place['category']]
+    record[34] = [None, [[day, ['09:00–20:00']] for day in DAYS]]
+    record[39] = place['address']
+    record[178] = [[place['phone'], None]] if place['phone'] else None
+    payload = [None] * 6 + [record]
+    return [[None, ")]}'\n" + json.dumps(payload, ensure_ascii=False)]]
+
+
+class FixtureSite:
+    """Şablonlardan arama listesi ve işletme sayfaları üreten sahte Maps."""
+
+    def __init__(self, places, page_size=20, feed_delay=100, detail_delay=50, latency=0):
+        self.places = places
+        self.page_size = page_size
+        self.feed_delay = feed_delay
+        self.detail_delay = detail_delay
+        self.latency = latency
+        self.base_url = ''
+        self._feed = load_template('feed.html')
+        self._card = load_template('card.html')
+        self._place = load_template('place.html')
+
+    def card_html(self, place):
+        rating = f"{place['rating']:.1f}".replace('.', ',')
+        phone = f"<span class=\"UsdlK\">{escape(place['phone'])}</span>" if place['phone'] else ''
+        website = (
+            f"<a data-value=\"Web sitesi\" href=\"{escape(place['website'])}\">Web sitesi</a>"
+            if place['website'] else ''
+        )
+        return self._card.substitute(
+            link=escape(self.base_url + place['path']), name=escape(place['name']), rating=rating,
+            reviews=place['reviews'], category=escape(place['category']),
+            address=escape(place['address']), card_phone=phone, card_website=website
+        )
+
+    def feed_page(self, query):
+        return self._feed.substitute(
+            query=escape(query), cards=script_json([self.card_html(p) for p in self.places]),
+            page_size=self.page_size, feed_delay=self.feed_delay
+        )
+
+    def place_page(self, place):
+        buttons = f"<button data-item-id=\"address\" aria-label=\"Adres: {escape(place['address'])}\"></button>"
+        if place['phone']:
+            buttons += (
+                f"<button data-item-id=\"phone:tel:{re.sub(r'[^0-9+]', '', place['phone'])}\""
+                f" aria-label=\"Telefon: {escape(place['phone'])}\"></button>"
+            )
+        if place['website']:
+            buttons += f"<a data-item-id=\"authority\" href=\"{escape(place['website'])}\">Web sitesi</a>"
+        return self._place.substitute(
+            name=escape(place['name']), rating=f"{place['rating']:.1f}".replace('.', ','),
+            reviews=place['reviews'], state=script_json(place_state(place)),
+            buttons=script_json(buttons), detail_delay=self.detail_delay
+        )
+
+    def render(self, path):
+        """İstenen yolun HTML'ini döndürür; bilinmeyen yol için None."""
+        if path.startswith('/maps/search/'):
+            return self.feed_page(unquote(path[len('/maps/search/'):]).strip('/').replace('+', ' '))
+        match = PLACE_LINK_RE.search(path)
+        if match:
+            index = int(match.group(1), 16)
+            if 1 <= index <= len(self.places):
+                return self.place_page(self.places[index - 1])
+        return None
+
+    def serve(self):
+        """Sunucuyu arka planda başlatır ve döndürür."""
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if site.latency:
+                    time.sleep(site.latency / 1000)
+                body = site.render(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# --- ÖLÇÜM ---
+
+class Timings:
+    """Aşama başına süre örnekleri."""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def measure(self, stage, func, *args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.add(stage, time.perf_counter() - started)
+        return result
+
+    def summary(self):
+        stats = {}
+        for stage, values in self.samples.items():
+            ordered = sorted(values)
+            stats[stage] = {
+                'n': len(values),
+                'total': round(sum(values), 6),
+                'mean': round(statistics.mean(values), 6),
+                'p50': round(statistics.median(values), 6),
+                'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 6),
+            }
+        return stats
+
+
+def run_browser_stages(site, timings, details):
+    """Chrome'u sahte Maps'e karşı app.scrape_google_maps adımlarıyla çalıştırır."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    from app import get_chrome_driver
+    from extractors import extract_detailed_data, extract_feed_cards, harvest_feed_links
+    from waits import AdaptiveTimeout, wait_for_feed_growth
+
+    driver = timings.measure('startup', get_chrome_driver)
+    try:
+        def open_feed():
+            driver.get(f"{site.base_url}/maps/search/ölçüm+berber/")
+            return WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']"))
+            )
+
+        feed = timings.measure('navigate', open_feed)
+
+        card_count = 0
+        scroll_timeout = AdaptiveTimeout(initial=4, minimum=1, maximum=10)
+        for _ in range(len(site.places) // max(1, site.page_size) + 5):
+            started = time.perf_counter()
+            driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", feed)
+            growth = wait_for_feed_growth(driver, feed, card_count, scroll_timeout.current)
+            timings.add('scroll', time.perf_counter() - started)
+            scroll_timeout.record(growth['elapsed'], growth['timed_out'])
+            card_count = growth['count']
+            if growth['end']:
+                break
+
+        links = timings.measure('harvest', harvest_feed_links, driver, feed)['links']
+        cards = timings.measure('feed_cards', extract_feed_cards, driver, feed)
+        if len(links) != len(site.places) or len(cards) != len(site.places):
+            print(f"Uyarı: {len(site.places)} işletmeden {len(links)} link, {len(cards)} kart okundu")
+
+        records = []
+        for index, link in enumerate(links[:details], 1):
+            timings.measure('detail_navigate', driver.get, link)
+            record = timings.measure('detail_extract', extract_detailed_data, driver, index, link)
+            if not record['isim']:
+                print(f"Uyarı: {link} sayfasından isim okunamadı")
+            records.append(record)
+        return cards + records
+    finally:
+        driver.quit()
+
+
+def run_offline_stages(site, timings, rounds):
+    """Tarayıcı gerektirmeyen aşamalar: HTML ayrıştırma, telefon analizi, dışa aktarma."""
+    pages = [
+        (place['index'], site.base_url + place['path'],
+         urlopen(site.base_url + place['path']).read().decode('utf-8'))
+        for place in site.places
+    ]
+    records = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        records = [parse_place_html(html, index, link) for index, link, html in pages]
+        timings.add('http_parse', (time.perf_counter() - started) / len(pages))
+    records = [record for record in records if record]
+    if len(records) != len(pages):
+        print(f"Uyarı: {len(pages)} sayfadan {len(records)} tanesi ayrıştırılabildi")
+
+    # Toplu analiz, biriken veri setinde tekrar eden numaraları bir kez işler
+    phones = [place['phone'] for place in site.places] * 100
+    for _ in range(rounds):
+        timings.measure('phones_single', lambda: [analyze_phone_number(p) for p in phones])
+        timings.measure('phones_batch', analyze_phone_numbers, phones)
+
+    export_records = records * max(1, 1000 // max(1, len(records)))
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(rounds):
+            timings.measure('export_csv', lambda: sum(len(line) for line in csv_stream(export_records)))
+            if EXCEL_AVAILABLE:
+                timings.measure('export_excel', lambda: build_excel(export_records).close())
+
+            def write_json():
+                with open(os.path.join(tmp, 'sonuclar.json'), 'w', encoding='utf-8') as f:
+                    json.dump(export_records, f, ensure_ascii=False, indent=2)
+
+            timings.measure('export_json', write_json)
+    return records
+
+
+# --- GEÇMİŞ ---
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        return ''
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(stats, history, config, runs, threshold, min_delta):
+    """
+    Aynı ayarlarla yapılmış son çalıştırmaların p50 medyanını taban alır.
+    Dönen sözlük: aşama -> (taban p50, değişim oranı, yavaşlama mı)
+    """
+    previous = [entry for entry in history if entry.get('config') == config][-runs:]
+    result = {}
+    for stage, current in stats.items():
+        values = [entry['stages'][stage]['p50'] for entry in previous if stage in entry['stages']]
+        if not values:
+            continue
+        baseline = statistics.median(values)
+        change = (current['p50'] - baseline) / baseline if baseline else 0.0
+        slower = change > threshold and current['p50'] - baseline > min_delta
+        result[stage] = (baseline, change, slower)
+    return result
+
+
+def print_report(stats, comparison):
+    print(f"\n{'Aşama':<16}{'n':>6}{'p50 ms':>11}{'p95 ms':>11}{'toplam s':>10}{'taban ms':>11}{'değişim':>10}")
+    for stage, s in stats.items():
+        baseline, change, slower = comparison.get(stage, (None, None, False))
+        print(
+            f"{stage:<16}{s['n']:>6}{s['p50'] * 1000:>11.2f}{s['p95'] * 1000:>11.2f}{s['total']:>10.2f}"
+            + (f"{baseline * 1000:>11.2f}{change:>+10.0%}" if baseline is not None else f"{'-':>11}{'-':>10}")
+            + ("  YAVAŞLADI" if slower else "")
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Çıkarma kodunu sahte Maps sayfalarıyla ölçer.")
+    parser.add_argument('--places', type=int, default=60, help="Listedeki işletme sayısı")
+    parser.add_argument('--details', type=int, default=20, help="Sayfası açılacak işletme sayısı")
+    parser.add_argument('--page-size', type=int, default=20, help="Kaydırma başına eklenen kart")
+    parser.add_argument('--feed-delay', type=int, default=100, help="Yeni kartların gecikmesi (ms)")
+    parser.add_argument('--detail-delay', type=int, default=50, help="Bilgi butonlarının gecikmesi (ms)")
+    parser.add_argument('--latency', type=int, default=0, help="Sunucu yanıt gecikmesi (ms)")
+    parser.add_argument('--rounds', type=int, default=5, help="Tarayıcısız aşamaların tekrar sayısı")
+    parser.add_argument('--no-browser', action='store_true', help="Chrome gerektiren aşamaları atla")
+    parser.add_argument('--serve', action='store_true', help="Sadece sahte Maps sunucusunu çalıştır")
+    parser.add_argument('--history', default=HISTORY_FILE, help="Geçmiş dosyası (JSON Lines)")
+    parser.add_argument('--no-save', action='store_true', help="Sonucu geçmişe ekleme")
+    parser.add_argument('--baseline-runs', type=int, default=5, help="Tabanı oluşturan son çalıştırma sayısı")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Yavaşlama eşiği (0.2 = %%20)")
+    parser.add_argument('--min-delta', type=float, default=0.002, help="Gürültü sayılan fark (saniye)")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Yavaşlama varsa 1 ile çık")
+    args = parser.parse_args()
+
+    site = FixtureSite(
+        make_places(args.places), args.page_size, args.feed_delay, args.detail_delay, args.latency
+    )
+    server = site.serve()
+
+    if args.serve:
+        print(f"Sahte Maps: {site.base_url}/maps/search/ölçüm+berber/")
+        print(f"İlk işletme: {site.base_url}{site.places[0]['path']}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            sys.exit(0)
+
+    timings = Timings()
+    browser = not args.no_browser
+    if browser:
+        try:
+            run_browser_stages(site, timings, args.details)
+        except Exception as e:
+            print(f"Tarayıcı aşamaları çalıştırılamadı: {e}")
+            browser = False
+    run_offline_stages(site, timings, args.rounds)
+    server.shutdown()
+
+    config = {
+        'places': args.places, 'details': args.details, 'page_size': args.page_size,
+        'feed_delay': args.feed_delay, 'detail_delay': args.detail_delay, 'latency': args.latency,
+        'rounds': args.rounds, 'browser': browser,
+        'lightweight': os.getenv('LIGHTWEIGHT_BROWSER', '').lower() in ('1', 'true', 'on'),
+    }
+    stats = timings.summary()
+    comparison = compare(
+        stats, load_history(args.history), config, args.baseline_runs, args.threshold, args.min_delta
+    )
+    print_report(stats, comparison)
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'time': time.time(), 'commit': git_commit(), 'config': config, 'stages': stats
+            }, ensure_ascii=False) + '\n')
+
+    if args.fail_on_regression and any(slower for _, _, slower in comparison.values()):
+        sys.exit(1)
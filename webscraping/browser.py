@@ -0,0 +1,62 @@
+"""
+Google Maps Scraper - Hafif Tarayıcı Profili
+Görsel, font, medya ve harita karolarını indirmeyen Chrome ayarları.
+Veri çıkarıcıların kullandığı DOM (metinler, aria-label'lar, linkler) değişmez.
+"""
+
+import os
+
+
+# Hafif profil isteğe bağlıdır: LIGHTWEIGHT_BROWSER=1
+LIGHTWEIGHT_BROWSER = os.getenv('LIGHTWEIGHT_BROWSER', '').lower() in ('1', 'true', 'on')
+
+# Hafif profilde pencere boyutu (daha az karo ve daha küçük çizim alanı)
+LIGHTWEIGHT_WINDOW = (1024, 768)
+
+# CDP Network.setBlockedURLs desenleri (* joker karakterdir)
+BLOCKED_URL_PATTERNS = [
+    # Görseller
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.ico', '*.bmp',
+    '*googleusercontent.com/p/*', '*lh3.googleusercontent.com/*', '*lh5.googleusercontent.com/*',
+    '*streetviewpixels-pa.googleapis.com/*', '*/maps/photometa/*',
+    # Fontlar
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*fonts.gstatic.com/*', '*fonts.googleapis.com/*',
+    # Medya
+    '*.mp4', '*.webm', '*.mp3', '*.m4a',
+    # Harita karoları ve uydu görüntüleri
+    '*/maps/vt?*', '*/maps/vt/*', '*/kh/v=*', '*khms*.google.com/*',
+]
+
+# Chrome içerik ayarları (2 = engelle)
+LIGHTWEIGHT_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.managed_default_content_settings.media_stream': 2,
+    'profile.managed_default_content_settings.notifications': 2,
+    'profile.managed_default_content_settings.geolocation': 2,
+}
+
+
+def apply_lightweight_profile(chrome_options):
+    """Chrome seçeneklerine hafif profil ayarlarını ekler."""
+    chrome_options.add_experimental_option('prefs', LIGHTWEIGHT_PREFS)
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument("--autoplay-policy=user-gesture-required")
+    chrome_options.add_argument("--disable-remote-fonts")
+    chrome_options.add_argument("--disable-background-networking")
+    return chrome_options
+
+
+def block_heavy_requests(driver, patterns=None):
+    """
+    Görsel, font, medya ve karo isteklerini CDP üzerinden engeller.
+    Ayar sekmenin oturumu boyunca geçerlidir; yeni açılan sekmelerde tekrar çağrılmalıdır.
+    Engelleme kurulamazsa False döner (sayfalar normal yüklenir).
+    """
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns or BLOCKED_URL_PATTERNS})
+        return True
+    except Exception as e:
+        print(f"İstek engelleme kurulamadı: {e}")
+        return False
@@ -0,0 +1,196 @@
+"""
+Google Maps Scraper - Önbellek
+İşletme detaylarını ve arama sonuçlarını saklayan kalıcı SQLite önbellekleri.
+"""
+
+import json
+import time
+import threading
+
+from db import connect, init_database, rewrite_json_rows
+
+
+PLACE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    place_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_places_accessed ON places (accessed_at);
+"""
+
+# Sonuçların kendisi iş deposundadır; burada sadece sonucu üreten iş tutulur
+QUERY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (
+    query_key TEXT PRIMARY KEY,
+    max_results INTEGER NOT NULL,
+    exhausted INTEGER NOT NULL DEFAULT 0,
+    job_id TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def query_key(location, profession, mode):
+    """Aynı anlama gelen aramalar için ortak anahtar üretir."""
+    parts = [' '.join(str(part).split()).casefold() for part in (location, profession, mode)]
+    return '|'.join(parts)
+
+
+class PlaceCache:
+    """
+    extract_detailed_data kayıtlarını işletme kimliğiyle saklar.
+
+    - ttl saniyeden eski kayıtlar bayat sayılır ve döndürülmez.
+    - Kayıt sayısı max_entries'i aşınca en uzun süredir okunmayanlar silinir (LRU).
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=50000, evict_every=100):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        init_database(path)
+        with self._connect() as conn:
+            conn.executescript(PLACE_SCHEMA)
+
+    def _connect(self):
+        return connect(self.path)
+
+    def get(self, place_id, max_age=None):
+        """
+        Taze kaydı döndürür; yoksa veya max_age (varsayılan ttl) saniyeden
+        eskiyse None döner.
+        """
+        if not place_id:
+            return None
+        max_age = self.ttl if max_age is None else max_age
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data, fetched_at FROM places WHERE place_id = ?", (place_id,)
+            ).fetchone()
+            if row is None or now - row[1] > max_age:
+                return None
+            conn.execute("UPDATE places SET accessed_at = ? WHERE place_id = ?", (now, place_id))
+        return json.loads(row[0])
+
+    def put(self, place_id, record):
+        """Kaydı şimdiki zamanla saklar."""
+        if not place_id:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO places (place_id, data, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (place_id, json.dumps(record, ensure_ascii=False), now, now)
+            )
+
+        with self._lock:
+            self._writes += 1
+            should_evict = self._writes % self.evict_every == 0
+        if should_evict:
+            self.evict()
+
+    def evict(self):
+        """Süresi dolmuş kayıtları ve kapasiteyi aşan en eski kayıtları siler."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM places WHERE fetched_at < ?", (now - self.ttl,))
+            if self.max_entries:
+                conn.execute(
+                    "DELETE FROM places WHERE place_id IN ("
+                    " SELECT place_id FROM places ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def rewrite(self, transform, batch_size=1000):
+        """
+        Önbellekteki kayıtları transform(kayıtlar) fonksiyonundan geçirip
+        yeniden yazar; kayıtların tazeliği değişmez. Değişen kayıt sayısını döndürür.
+        """
+        with self._connect() as conn:
+            return rewrite_json_rows(
+                conn, 'places', 'place_id', 'data', transform, batch_size, start=''
+            )
+
+    def stats(self):
+        """Önbellekteki kayıt sayısını döndürür."""
+        with self._connect() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+        return {'entries': count, 'max_entries': self.max_entries, 'ttl': self.ttl}
+
+
+class QueryCache:
+    """
+    Tamamlanmış aramaları (konum, meslek, mod) anahtarıyla, sonuçlarını
+    üreten işin kimliğiyle saklar; sonuçlar iş deposundan okunur.
+
+    Daha büyük max_results ile yapılmış bir arama, daha küçük bir istek için
+    de kullanılır (sonuçlarının ilk kısmı). Liste sonuna ulaşılmış (exhausted)
+    aramalar her max_results için yeterli sayılır.
+    """
+
+    def __init__(self, path, ttl=3600):
+        self.path = path
+        self.ttl = ttl
+
+        init_database(path)
+        with self._connect() as conn:
+            # Sonuçları JSON olarak saklayan eski biçim atılır (sadece önbellek)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(queries)")}
+            if columns and 'job_id' not in columns:
+                conn.execute("DROP TABLE queries")
+            conn.executescript(QUERY_SCHEMA)
+
+    def _connect(self):
+        return connect(self.path)
+
+    def get(self, location, profession, mode, max_results, max_age=None):
+        """
+        max_age saniyeden (varsayılan ttl) yeni ve yeterince büyük bir sonuç
+        varsa onu üreten işin kimliğini döndürür, yoksa None. Çağıran,
+        sıra numarası max_results'u geçmeyen sonuçları kullanır.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        if max_age <= 0:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT max_results, exhausted, job_id, fetched_at FROM queries"
+                " WHERE query_key = ?", (query_key(location, profession, mode),)
+            ).fetchone()
+        if row is None or time.time() - row[3] > max_age:
+            return None
+        if row[0] < max_results and not row[1]:
+            return None
+        return row[2]
+
+    def put(self, location, profession, mode, max_results, job_id, exhausted=False):
+        """
+        Aramanın sonucunu üreten işi saklar. Aynı anahtar için daha büyük ve taze bir
+        sonuç varsa üzerine yazılmaz.
+        """
+        now = time.time()
+        key = query_key(location, profession, mode)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT max_results, exhausted, fetched_at FROM queries WHERE query_key = ?", (key,)
+            ).fetchone()
+            if row and now - row[2] <= self.ttl and (row[1] or row[0] > max_results) and not exhausted:
+                conn.execute("COMMIT")
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO queries (query_key, max_results, exhausted, job_id, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, max_results, int(exhausted), job_id, now)
+            )
+            conn.execute("DELETE FROM queries WHERE fetched_at < ?", (now - self.ttl,))
+            conn.execute("COMMIT")
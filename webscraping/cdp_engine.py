@@ -0,0 +1,260 @@
+"""
+Google Maps Scraper - CDP Motoru
+İşletme sayfalarını havuzdaki Chrome'a DevTools protokolü (CDP) üzerinden
+doğrudan bağlanarak, aynı tarayıcıda birden fazla sekmede eşzamanlı çeker.
+Sekmeler yoklama (polling) yapmaz; sayfa ve DOM olaylarını bekler.
+Kayıtlar extract_detailed_data ile aynı biçimdedir.
+"""
+
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+from browser import BLOCKED_URL_PATTERNS, LIGHTWEIGHT_BROWSER
+from extractors import DETAIL_FIELDS_JS, apply_detail_fields, empty_result
+from metrics import EXTRACT, NAVIGATION, WAIT, bind, timed
+
+# Websocket istemcisi (isteğe bağlı)
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+
+# İşletme bilgi butonları ([data-item-id]) oluşana kadar bekler.
+# MutationObserver ile tetiklenir; zaman aşımında false döner.
+DETAIL_READY_JS = """
+new Promise((resolve) => {
+    const ready = () => !!document.querySelector('[data-item-id]');
+    if (ready()) return resolve(true);
+    const observer = new MutationObserver(() => {
+        if (ready()) { observer.disconnect(); clearTimeout(timer); resolve(true); }
+    });
+    const timer = setTimeout(() => { observer.disconnect(); resolve(false); }, %d);
+    observer.observe(document, {childList: true, subtree: true});
+})
+"""
+
+# DETAIL_FIELDS_JS bir fonksiyon gövdesidir; Runtime.evaluate için sarılır
+DETAIL_FIELDS_EXPRESSION = f"(() => {{{DETAIL_FIELDS_JS}}})()"
+
+
+def debugger_address(driver):
+    """Selenium ile açılmış Chrome'un DevTools adresi (ör. localhost:41234)."""
+    return (driver.capabilities.get('goog:chromeOptions') or {}).get('debuggerAddress')
+
+
+def browser_ws_url(address):
+    """DevTools adresinden tarayıcı düzeyindeki websocket adresini alır."""
+    with urlopen(f"http://{address}/json/version", timeout=5) as response:
+        return json.load(response)['webSocketDebuggerUrl']
+
+
+class CDPConnection:
+    """
+    Tek websocket üzerinden CDP komutları ve olayları.
+    Sekmelere 'flatten' oturumlarla bağlanılır; her mesaj sessionId taşır.
+    """
+
+    def __init__(self, ws):
+        self._ws = ws
+        self._next_id = 0
+        self._pending = {}
+        self._waiters = []
+        self._reader = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        error = ConnectionError("CDP bağlantısı kapandı")
+        try:
+            async for raw in self._ws:
+                message = json.loads(raw)
+                if 'id' in message:
+                    future = self._pending.pop(message['id'], None)
+                    if future is None or future.done():
+                        continue
+                    if 'error' in message:
+                        future.set_exception(RuntimeError(message['error'].get('message', 'CDP hatası')))
+                    else:
+                        future.set_result(message.get('result', {}))
+                elif 'method' in message:
+                    key = (message['method'], message.get('sessionId'))
+                    for waiter in [w for w in self._waiters if w[0] == key]:
+                        self._waiters.remove(waiter)
+                        if not waiter[1].done():
+                            waiter[1].set_result(message.get('params', {}))
+        except Exception as e:
+            error = e
+        finally:
+            for future in list(self._pending.values()) + [w[1] for w in self._waiters]:
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+            self._waiters.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        """Komutu gönderir ve yanıtını bekler."""
+        self._next_id += 1
+        message = {'id': self._next_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        await self._ws.send(json.dumps(message))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message['id'], None)
+
+    def expect(self, method, session_id=None):
+        """
+        Olayı bekleyen future döndürür. Olayı tetikleyecek komuttan
+        önce çağrılmalıdır, yoksa olay kaçabilir.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(((method, session_id), future))
+        return future
+
+    def discard(self, future):
+        """Artık beklenmeyen olayı listeden çıkarır."""
+        self._waiters = [w for w in self._waiters if w[1] is not future]
+
+    def close(self):
+        self._reader.cancel()
+
+
+class CDPTab:
+    """Tarayıcıda açılan ve CDP oturumuyla bağlanılan bir sekme."""
+
+    def __init__(self, conn, target_id, session_id):
+        self.conn = conn
+        self.target_id = target_id
+        self.session_id = session_id
+
+    @classmethod
+    async def open(cls, conn, block=False):
+        target = await conn.send('Target.createTarget', {'url': 'about:blank'})
+        attached = await conn.send(
+            'Target.attachToTarget', {'targetId': target['targetId'], 'flatten': True}
+        )
+        tab = cls(conn, target['targetId'], attached['sessionId'])
+        await tab.send('Page.enable')
+        if block:
+            # Hafif profil: yeni sekmede engelleme ayrıca kurulmalı
+            await tab.send('Network.enable')
+            await tab.send('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        return tab
+
+    async def send(self, method, params=None, timeout=30):
+        return await self.conn.send(method, params, self.session_id, timeout)
+
+    async def evaluate(self, expression, timeout=30):
+        """İfadeyi sayfada çalıştırır; Promise ise sonucunu bekler."""
+        response = await self.send('Runtime.evaluate', {
+            'expression': expression, 'awaitPromise': True, 'returnByValue': True
+        }, timeout)
+        if 'exceptionDetails' in response:
+            raise RuntimeError(response['exceptionDetails'].get('text', 'JS hatası'))
+        return response.get('result', {}).get('value')
+
+    async def navigate(self, url, timeout):
+        """Adrese gider ve DOMContentLoaded olayını bekler."""
+        loaded = self.conn.expect('Page.domContentEventFired', self.session_id)
+        try:
+            response = await self.send('Page.navigate', {'url': url}, timeout)
+            if response.get('errorText'):
+                raise RuntimeError(response['errorText'])
+            await asyncio.wait_for(loaded, timeout)
+        finally:
+            self.conn.discard(loaded)
+
+    async def close(self):
+        try:
+            await self.conn.send('Target.closeTarget', {'targetId': self.target_id}, timeout=5)
+        except Exception:
+            pass
+
+
+async def extract_place(tab, index, link, timeout):
+    """Sekmede işletme sayfasını açar ve extract_detailed_data biçiminde kayıt döndürür."""
+    with timed(NAVIGATION, 'navigate', kind='cdp'):
+        await tab.navigate(link, timeout)
+    with timed(WAIT, 'wait', kind='cdp'):
+        await tab.evaluate(DETAIL_READY_JS % int(timeout * 1000), timeout + 5)
+    with timed(EXTRACT, 'extract', kind='cdp'):
+        fields = await tab.evaluate(DETAIL_FIELDS_EXPRESSION)
+    return apply_detail_fields(empty_result(index, link), fields if isinstance(fields, dict) else {})
+
+
+# --- ASENKRON İSTEMCİ ---
+
+async def _tab_worker(conn, items, on_result, failed, timeout, should_stop, block, db):
+    """
+    Sekmede sıradaki linkleri çeker. on_result ve should_stop depoya eriştiği
+    için db thread'inde çalıştırılır; beklerken diğer sekmeler durmaz.
+    """
+    loop = asyncio.get_running_loop()
+    tab = await CDPTab.open(conn, block)
+    try:
+        while items:
+            item = items.pop(0)
+            index, link = item[0], item[1]
+            if should_stop and await loop.run_in_executor(db, should_stop):
+                failed.append(item)
+                continue
+            try:
+                result = await extract_place(tab, index, link, timeout)
+            except Exception as e:
+                print(f"CDP hata (Index {index}): {e}")
+                result = None
+            if result and result['isim']:
+                await loop.run_in_executor(db, on_result, item, result)
+            else:
+                failed.append(item)
+    finally:
+        await tab.close()
+
+
+async def _fetch_all(ws_url, items, on_result, tabs, timeout, should_stop, block):
+    failed = []
+    pending = list(items)
+    # Sonuçlar tek thread'de sırayla kaydedilir; ölçümler çağıranın işine yazılır
+    on_result = bind(on_result)
+    should_stop = should_stop and bind(should_stop)
+    with ThreadPoolExecutor(max_workers=1) as db:
+        async with websockets.connect(ws_url, max_size=None) as ws:
+            conn = CDPConnection(ws)
+            try:
+                results = await asyncio.gather(*(
+                    _tab_worker(conn, pending, on_result, failed, timeout, should_stop, block, db)
+                    for _ in range(min(tabs, len(pending)))
+                ), return_exceptions=True)
+            finally:
+                conn.close()
+
+    # Sekme açılamadıysa işlenmemiş öğeler de geri verilir
+    for error in results:
+        if isinstance(error, Exception):
+            print(f"CDP sekmesi açılamadı: {error}")
+    return failed + pending
+
+
+def fetch_place_details(driver, items, on_result, tabs=8, timeout=10, should_stop=None):
+    """
+    (index, link, ...) öğelerini sürücünün tarayıcısında en fazla tabs sekmede
+    eşzamanlı çeker. Her kayıt için on_result(item, result) çağrılır
+    (sırayla, olay döngüsü dışındaki tek bir thread'de). Çekilemeyen öğeler döner.
+    Sürücü bu sırada başka iş için kullanılmamalıdır.
+    """
+    if not WEBSOCKETS_AVAILABLE:
+        raise RuntimeError("websockets yüklü değil.")
+    if not items:
+        return []
+    address = debugger_address(driver)
+    if not address:
+        raise RuntimeError("Tarayıcının DevTools adresi bulunamadı.")
+    return asyncio.run(_fetch_all(
+        browser_ws_url(address), items, on_result, max(1, tabs), timeout, should_stop,
+        LIGHTWEIGHT_BROWSER
+    ))
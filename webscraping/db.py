@@ -0,0 +1,69 @@
+"""
+Google Maps Scraper - SQLite Yardımcıları
+İş deposu, önbellek ve işletme indeksinin paylaştığı bağlantı açma ve
+JSON kayıtlarını toplu yeniden yazma yardımcıları.
+"""
+
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+
+
+def init_database(path):
+    """Veritabanının dizinini oluşturur ve WAL kipini açar."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+
+
+@contextmanager
+def connect(path, rows=False):
+    """
+    Otomatik işlem modunda (isolation_level=None) bağlantı açar; kilitli
+    veritabanında 30 saniyeye kadar bekler. rows=True ise satırlar
+    sqlite3.Row olarak döner.
+    """
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    if rows:
+        conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def rewrite_json_rows(conn, table, key, column, transform, batch_size=1000, start=0, derived=None):
+    """
+    table tablosundaki JSON column sütununu key sırasıyla batch_size'lık
+    gruplar halinde transform(kayıtlar) fonksiyonundan geçirir ve değişen
+    satırları yazar. start, key'in en küçük değerinden küçük olmalıdır.
+    derived ({sütun: fonksiyon(kayıt)}) verilirse bu sütunlar da kayıttan
+    yeniden hesaplanır. Değişen satır sayısını döndürür.
+    """
+    derived = derived or {}
+    assignments = ', '.join(f"{name} = ?" for name in [*derived, column])
+    select_sql = f"SELECT {key}, {column} FROM {table} WHERE {key} > ? ORDER BY {key} LIMIT ?"
+    update_sql = f"UPDATE {table} SET {assignments} WHERE {key} = ?"
+
+    changed = 0
+    last = start
+    while True:
+        rows = conn.execute(select_sql, (last, batch_size)).fetchall()
+        if not rows:
+            break
+        last = rows[-1][0]
+        records = transform([json.loads(row[1]) for row in rows])
+        updates = []
+        for row, record in zip(rows, records):
+            data = json.dumps(record, ensure_ascii=False)
+            if data != row[1]:
+                updates.append((*(func(record) for func in derived.values()), data, row[0]))
+        if updates:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(update_sql, updates)
+            conn.execute("COMMIT")
+            changed += len(updates)
+    return changed
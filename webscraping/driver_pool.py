@@ -0,0 +1,208 @@
+"""
+Google Maps Scraper - Chrome Sürücü Havuzu
+Aramalar arasında yeniden kullanılan, uzun ömürlü WebDriver havuzu.
+"""
+
+import os
+import atexit
+import threading
+import time
+
+
+class DriverPool:
+    """
+    Chrome sürücülerini işler arasında yeniden kullanmak için havuz.
+
+    - Her kiralamada sağlık kontrolü yapılır, yanıt vermeyen sürücü yenilenir.
+    - max_age saniyeden eski veya max_jobs kez kiralanmış sürücüler kapatılır.
+    - Sürücü havuza dönerken çerezleri, depolaması ve fazla sekmeleri temizlenir.
+    - fork ile oluşan alt süreç (Gunicorn --preload) boş havuzla başlar.
+    """
+
+    def __init__(self, factory, max_size=4, max_age=1800, max_jobs=50):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.max_age = max_age
+        self.max_jobs = max_jobs
+
+        self._idle = []
+        self._info = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+        atexit.register(self.close_all)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    # --- Kiralama ---
+
+    def acquire(self, wait=True, timeout=None):
+        """
+        Havuzdan sağlıklı bir sürücü kiralar.
+        Boşta sürücü yoksa ve kapasite doluysa wait=False iken None döner.
+        Sağlık kontrolü, kapatma ve yeni tarayıcı başlatma kilit dışında
+        yapılır; yanıt vermeyen bir Chrome diğer çağrıları bekletmez.
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+
+        while True:
+            driver = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Sürücü havuzu kapatıldı.")
+
+                    if self._idle:
+                        driver = self._idle.pop()
+                        expired = self._is_expired(driver)
+                        if expired:
+                            self._forget(driver)
+                        break
+
+                    if len(self._info) < self.max_size:
+                        # Yer ayır, tarayıcıyı kilit dışında başlat
+                        placeholder = object()
+                        self._info[placeholder] = None
+                        break
+
+                    if not wait:
+                        return None
+                    remaining = deadline - time.time() if deadline else None
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+
+            if driver is None:
+                break
+
+            # Boştaki sürücü havuzda yerini korurken kilit dışında denetlenir
+            if not expired and self._is_healthy(driver):
+                with self._cond:
+                    info = self._info.get(driver)
+                    if info is not None:
+                        info['jobs'] += 1
+                        return driver
+            with self._cond:
+                self._forget(driver)
+            self._quit(driver)
+
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._cond:
+                del self._info[placeholder]
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            del self._info[placeholder]
+            self._info[driver] = {'created_at': time.time(), 'jobs': 1}
+        return driver
+
+    def release(self, driver, healthy=True):
+        """Sürücüyü temizleyip havuza geri verir, sorunluysa kapatır."""
+        if driver is None:
+            return
+
+        if healthy and not self._closed:
+            healthy = self._reset(driver)
+
+        with self._cond:
+            if driver not in self._info:
+                return
+            keep = healthy and not self._closed and not self._is_expired(driver)
+            if keep:
+                self._idle.append(driver)
+            else:
+                self._forget(driver)
+            self._cond.notify()
+        if not keep:
+            self._quit(driver)
+
+    def close_all(self):
+        """Havuzdaki tüm sürücüleri kapatır."""
+        with self._cond:
+            self._closed = True
+            drivers = [driver for driver, info in self._info.items() if info is not None]
+            for driver in drivers:
+                self._forget(driver)
+            self._idle = []
+            self._cond.notify_all()
+        for driver in drivers:
+            self._quit(driver)
+
+    def stats(self):
+        """Havuz durumunu döndürür."""
+        with self._cond:
+            return {
+                'size': len(self._info),
+                'idle': len(self._idle),
+                'max_size': self.max_size
+            }
+
+    # --- Yardımcılar ---
+
+    def _after_fork(self):
+        """
+        Alt süreçte ana sürecin tarayıcıları ve kilidi bırakılır.
+        Tarayıcılar ana sürece ait olduğundan kapatılmaz, yalnızca unutulur.
+        """
+        self._idle = []
+        self._info = {}
+        self._cond = threading.Condition()
+
+    def _is_expired(self, driver):
+        info = self._info.get(driver)
+        if not info:
+            return True
+        if self.max_age and time.time() - info['created_at'] > self.max_age:
+            return True
+        if self.max_jobs and info['jobs'] >= self.max_jobs:
+            return True
+        return False
+
+    def _is_healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _reset(self, driver):
+        """Kiralamalar arasında tarayıcı durumunu sıfırlar."""
+        try:
+            # Fazla sekmeleri kapat, ilk sekmede kal
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            try:
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+                    'origin': 'https://www.google.com',
+                    'storageTypes': 'all'
+                })
+            except Exception:
+                driver.delete_all_cookies()
+
+            driver.get('about:blank')
+            return True
+        except Exception as e:
+            print(f"Sürücü sıfırlanamadı, kapatılıyor: {e}")
+            return False
+
+    def _forget(self, driver):
+        """Sürücüyü havuzdan çıkarır (kilit tutulurken çağrılır)."""
+        self._info.pop(driver, None)
+        if driver in self._idle:
+            self._idle.remove(driver)
+        self._cond.notify()
+
+    @staticmethod
+    def _quit(driver):
+        """Tarayıcıyı kapatır (kilit dışında çağrılır)."""
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,100 @@
+"""
+Google Maps Scraper - Dışa Aktarma
+Sonuçları belleğe bütün dosya kurmadan CSV ve Excel olarak yazan yardımcılar.
+"""
+
+import csv
+import tempfile
+
+# Excel Importları
+try:
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+    EXCEL_AVAILABLE = True
+except ImportError:
+    EXCEL_AVAILABLE = False
+
+
+EXPORT_HEADERS = ['Sıra', 'İşletme Adı', 'Puan', 'Yorum Sayısı', 'Adres', 'Telefon', 'Tip', 'WhatsApp', 'Website', 'Link']
+
+# Excel sütun genişlikleri
+COLUMN_WIDTHS = [6, 35, 8, 12, 40, 18, 8, 30, 35, 50]
+
+# Telefon hat türlerinin 'Tip' sütunundaki karşılıkları
+PHONE_TYPE_LABELS = {'mobile': 'Cep', 'landline': 'Sabit', 'service': 'Servis', 'tollfree': 'Ücretsiz'}
+
+# Excel dosyası bu boyuta kadar bellekte, sonrası geçici dosyada tutulur
+SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
+
+def phone_type_label(tel_bilgi):
+    """Hat türünün etiketi; türü olmayan eski kayıtlarda cep/sabit ayrımı."""
+    if 'type' in tel_bilgi:
+        return PHONE_TYPE_LABELS.get(tel_bilgi['type'], '')
+    return 'Cep' if tel_bilgi.get('is_mobile') else 'Sabit'
+
+
+def export_rows(results):
+    """Her işletme kaydı için dışa aktarılacak satırı üretir."""
+    for item in results:
+        tel_bilgi = item.get('telefon_bilgi') or {}
+        yield [
+            item.get('sira'),
+            item.get('isim'),
+            item.get('puan'),
+            item.get('degerlendirme_sayisi'),
+            item.get('adres'),
+            item.get('telefon'),
+            phone_type_label(tel_bilgi),
+            tel_bilgi.get('whatsapp_link', ''),
+            item.get('website', ''),
+            item.get('link', '')
+        ]
+
+
+class _LineEcho:
+    """csv.writer'ın yazdığı satırı saklamadan geri döndürür."""
+
+    def write(self, line):
+        return line
+
+
+def csv_stream(results):
+    """CSV içeriğini satır satır üreten generator."""
+    writer = csv.writer(_LineEcho(), delimiter=';')
+    yield writer.writerow(EXPORT_HEADERS)
+    for row in export_rows(results):
+        yield writer.writerow(row)
+
+
+def build_excel(results):
+    """
+    Sonuçları write-only modda Excel'e yazar ve başa sarılmış bir dosya
+    nesnesi döndürür. Büyük dosyalar diske taşar, bellekte tutulmaz.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Sonuclar")
+
+    # Sütun genişlikleri (write-only modda satırlardan önce ayarlanmalı)
+    for i, width in enumerate(COLUMN_WIDTHS, 1):
+        ws.column_dimensions[chr(64 + i)].width = width
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
+
+    header = []
+    for title in EXPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = header_font
+        cell.fill = header_fill
+        header.append(cell)
+    ws.append(header)
+
+    for row in export_rows(results):
+        ws.append(row)
+
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    wb.save(output)
+    output.seek(0)
+    return output
@@ -0,0 +1,354 @@
+"""
+Google Maps Scraper - Veri Çıkarıcılar
+İşletme sayfası ve liste kartlarından veri okuyan ortak fonksiyonlar.
+
+İki mod vardır:
+- batch:   Sayfadaki tüm alanlar tek bir execute_script çağrısıyla okunur.
+- classic: Her alan ayrı find_element / get_attribute çağrısıyla okunur.
+Her iki modda da ham alanlar aynı Python eşlemesinden geçer.
+"""
+
+import os
+import re
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from metrics import EXTRACT, FIELD_MISSING, WAIT, timed
+from phones import analyze_phone_number
+from waits import AdaptiveTimeout, wait_for_place_details
+
+
+# Varsayılan çıkarma modu: 'batch' veya 'classic'
+EXTRACTION_MODE = os.getenv('EXTRACTION_MODE', 'batch')
+
+# İşletme sayfasının ham alanlarını tek seferde okur
+DETAIL_FIELDS_JS = """
+const q = (s) => document.querySelector(s);
+const text = (s) => { const el = q(s); return el ? el.innerText.trim() : ''; };
+const attr = (s, a) => { const el = q(s); return el ? el.getAttribute(a) : null; };
+const web = q("a[data-item-id='authority']");
+return {
+    isim: text('h1'),
+    puan: text("div.F7nice span[aria-hidden='true']"),
+    yorum_label: attr("div.F7nice span[aria-label*='yorum']", 'aria-label'),
+    adres_label: attr("button[data-item-id='address']", 'aria-label'),
+    telefon_label: attr("button[data-item-id^='phone']", 'aria-label'),
+    website: web ? web.href : null
+};
+"""
+
+# Feed'deki tüm işletme kartlarının ham alanlarını tek seferde okur
+FEED_CARDS_JS = """
+const root = arguments[0] || document;
+return Array.from(root.querySelectorAll('div.Nv2PK')).map((card) => {
+    const text = (s) => { const el = card.querySelector(s); return el ? el.innerText.trim() : ''; };
+    const link = card.querySelector('a.hfpxzc');
+    const web = card.querySelector("a[data-value='Web sitesi'], a[data-value='Website']");
+    return {
+        name: text('div.qBF1Pd'),
+        rating: text('span.MW4etd'),
+        reviews: text('span.UY7F9'),
+        info_spans: Array.from(card.querySelectorAll('div.W4Efsd span')).map((e) => e.innerText.trim()),
+        info_lines: Array.from(card.querySelectorAll('div.W4Efsd')).map((e) => e.innerText.trim()),
+        hours: text('span.ZDu9vd span'),
+        phone: text('span.UsdlK'),
+        website: web ? web.href : '',
+        link: link ? link.href : ''
+    };
+});
+"""
+
+# Feed'de start indeksinden sonra eklenen linkleri ve liste sonu bilgisini döndürür
+HARVEST_LINKS_JS = """
+const feed = arguments[0];
+const anchors = feed.querySelectorAll('a.hfpxzc');
+let start = arguments[1];
+if (start > anchors.length) start = 0;
+const links = [];
+for (let i = start; i < anchors.length; i++) links.push(anchors[i].href);
+const last = feed.lastElementChild;
+return {
+    links: links,
+    total: anchors.length,
+    end: !!last && (last.innerText || '').includes('sonuna')
+};
+"""
+
+# Google'ın çerez onayı ve "olağan dışı trafik" (captcha) sayfalarını tanır
+BLOCK_PAGE_JS = """
+const text = ((document.body && document.body.innerText) || '').slice(0, 3000).toLowerCase();
+if (document.querySelector("form[action*='consent']") || text.includes('devam etmeden önce')
+        || text.includes('before you continue')) return 'consent';
+if (document.querySelector("#captcha-form, iframe[src*='recaptcha']") || text.includes('olağan dışı trafik')
+        || text.includes('unusual traffic')) return 'captcha';
+return null;
+"""
+
+# İşletme sayfalarındaki bilgi butonları için uyarlanan bekleme süresi
+detail_timeout = AdaptiveTimeout(initial=2, minimum=0.3, maximum=5)
+
+
+# --- İŞLETME SAYFASI ---
+
+def empty_result(index, link):
+    """Boş işletme kaydı oluşturur."""
+    return {
+        'sira': index,
+        'isim': '',
+        'puan': '',
+        'degerlendirme_sayisi': '',
+        'kategori': '',
+        'adres': '',
+        'telefon': '',
+        'telefon_bilgi': {},
+        'website': '',
+        'calisma_saatleri': {},
+        'calisma_durumu': '',
+        'plus_code': '',
+        'link': link
+    }
+
+
+# İşletme sayfasından okunan ham alanlar
+DETAIL_FIELD_KEYS = ('isim', 'puan', 'yorum_label', 'adres_label', 'telefon_label', 'website')
+
+
+def apply_detail_fields(result, fields):
+    """Sayfadan okunan ham alanları işletme kaydına eşler."""
+    # Seçici sağlığı için bulunamayan ham alanlar sayılır
+    for field in DETAIL_FIELD_KEYS:
+        if not fields.get(field):
+            FIELD_MISSING.inc(field=field)
+
+    result['isim'] = (fields.get('isim') or '').strip()
+    result['puan'] = (fields.get('puan') or '').strip()
+
+    text = fields.get('yorum_label')
+    match = re.search(r'([\d.,]+)', text) if text else None
+    result['degerlendirme_sayisi'] = match.group(1) if match else ''
+
+    label = fields.get('adres_label')
+    result['adres'] = label.replace("Adres:", "").strip() if label else ''
+
+    # Telefon butonu yoksa telefon_bilgi boş kalır
+    label = fields.get('telefon_label')
+    if label is not None:
+        raw_phone = label.replace("Telefon:", "").strip()
+        result['telefon'] = raw_phone
+        result['telefon_bilgi'] = analyze_phone_number(raw_phone)
+
+    result['website'] = fields.get('website') or ''
+    return result
+
+
+def read_detail_fields_classic(driver):
+    """Ham alanları her biri için ayrı WebDriver çağrısıyla okur."""
+    fields = {}
+
+    def read(key, selector, getter):
+        try:
+            fields[key] = getter(driver.find_element(By.CSS_SELECTOR, selector))
+        except Exception:
+            pass
+
+    read('isim', "h1", lambda e: e.text)
+    read('puan', "div.F7nice span[aria-hidden='true']", lambda e: e.text)
+    read('yorum_label', "div.F7nice span[aria-label*='yorum']", lambda e: e.get_attribute("aria-label"))
+    read('adres_label', "button[data-item-id='address']", lambda e: e.get_attribute("aria-label"))
+    read('telefon_label', "button[data-item-id^='phone']", lambda e: e.get_attribute("aria-label"))
+    read('website', "a[data-item-id='authority']", lambda e: e.get_attribute("href"))
+    return fields
+
+
+def read_detail_fields(driver, mode=None):
+    """Ham alanları seçilen modda okur; batch başarısız olursa classic'e döner."""
+    if (mode or EXTRACTION_MODE) == 'batch':
+        try:
+            fields = driver.execute_script(DETAIL_FIELDS_JS)
+            if isinstance(fields, dict):
+                return fields
+        except Exception as e:
+            print(f"Toplu okuma başarısız, tek tek okunuyor: {e}")
+    return read_detail_fields_classic(driver)
+
+
+def extract_detailed_data(driver, index, link, mode=None):
+    """Tekil işletme detaylarını çeker."""
+    result = empty_result(index, link)
+
+    try:
+        with timed(WAIT, 'wait', kind='detail'):
+            WebDriverWait(driver, 5).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "h1, div.fontHeadlineLarge"))
+            )
+            elapsed, timed_out = wait_for_place_details(driver, detail_timeout.current)
+        detail_timeout.record(elapsed, timed_out)
+
+        with timed(EXTRACT, 'extract', kind='detail'):
+            fields = read_detail_fields(driver, mode)
+        return apply_detail_fields(result, fields)
+
+    except Exception as e:
+        print(f"Veri çekme hatası (Index {index}): {e}")
+        return result
+
+
+def detect_block(driver):
+    """
+    Açık sayfa çerez onayı ('consent') veya captcha ('captcha') sayfasıysa
+    nedenini, değilse None döndürür.
+    """
+    try:
+        url = driver.current_url or ''
+        if 'consent.google.' in url:
+            return 'consent'
+        if '/sorry/' in url:
+            return 'captcha'
+        return driver.execute_script(BLOCK_PAGE_JS)
+    except Exception:
+        return None
+
+
+# --- LİSTE KARTLARI ---
+
+def harvest_feed_links(driver, feed, start=0):
+    """
+    Feed'de start indeksinden sonraki yeni linkleri tek çağrıda okur.
+    Dönen sözlük: links, total (toplam kart), end (liste sonu görüldü mü)
+    """
+    try:
+        with timed(EXTRACT, 'extract', kind='links'):
+            batch = driver.execute_script(HARVEST_LINKS_JS, feed, start) or {}
+    except Exception as e:
+        print(f"Linkler okunamadı: {e}")
+        batch = {}
+    return {
+        'links': [link for link in batch.get('links', []) if link],
+        'total': batch.get('total', start),
+        'end': bool(batch.get('end'))
+    }
+
+
+def map_feed_card(card, index):
+    """Liste kartından okunan ham alanları kayda eşler, isim yoksa None döner."""
+    name = card.get('name') or ''
+    if not name:
+        return None
+
+    # Kategori/Tür
+    category = ""
+    for text in card.get('info_spans') or []:
+        if text and "·" not in text and not text.startswith("("):
+            category = text
+            break
+
+    # Adres
+    address = ""
+    for text in card.get('info_lines') or []:
+        if "İstanbul" in text or any(char.isdigit() for char in text):
+            address = text.split("·")[-1].strip() if "·" in text else text
+            break
+
+    return {
+        "sira": index,
+        "isim": name,
+        "puan": card.get('rating') or '',
+        "degerlendirme_sayisi": (card.get('reviews') or '').replace("(", "").replace(")", ""),
+        "kategori": category,
+        "adres": address,
+        "calisma_saati": card.get('hours') or '',
+        "telefon": card.get('phone') or '',
+        "website": card.get('website') or '',
+        "link": card.get('link') or ''
+    }
+
+
+def feed_card_result(card, index):
+    """map_feed_card kaydını işletme sayfası kaydı biçimine dönüştürür."""
+    result = empty_result(index, card.get('link', ''))
+    result.update({
+        'isim': card.get('isim', ''),
+        'puan': card.get('puan', ''),
+        'degerlendirme_sayisi': card.get('degerlendirme_sayisi', ''),
+        'kategori': card.get('kategori', ''),
+        'adres': card.get('adres', ''),
+        'calisma_durumu': card.get('calisma_saati', ''),
+        'website': card.get('website', '')
+    })
+    if card.get('telefon'):
+        result['telefon'] = card['telefon']
+        result['telefon_bilgi'] = analyze_phone_number(card['telefon'])
+    return result
+
+
+def needs_detail_page(result):
+    """Kart kaydında telefon veya website eksikse True döner."""
+    return not (result.get('telefon') and result.get('website'))
+
+
+def fill_missing_fields(target, source):
+    """target'taki boş alanları source'taki aynı isimli alanlarla doldurur."""
+    for key, value in source.items():
+        if key in target and not target[key] and value:
+            target[key] = value
+    return target
+
+
+def read_feed_card_classic(place):
+    """Tek bir kartın ham alanlarını ayrı WebDriver çağrılarıyla okur."""
+    card = {}
+
+    def read(key, selector, getter, default=''):
+        try:
+            card[key] = getter(place.find_element(By.CSS_SELECTOR, selector))
+        except Exception:
+            card[key] = default
+
+    read('name', "div.qBF1Pd", lambda e: e.text)
+    read('rating', "span.MW4etd", lambda e: e.text)
+    read('reviews', "span.UY7F9", lambda e: e.text)
+    read('hours', "span.ZDu9vd span", lambda e: e.text)
+    read('phone', "span.UsdlK", lambda e: e.text)
+    read('website', "a[data-value='Web sitesi'], a[data-value='Website']", lambda e: e.get_attribute("href"))
+    read('link', "a.hfpxzc", lambda e: e.get_attribute("href"))
+
+    try:
+        card['info_spans'] = [e.text for e in place.find_elements(By.CSS_SELECTOR, "div.W4Efsd span")]
+        card['info_lines'] = [e.text for e in place.find_elements(By.CSS_SELECTOR, "div.W4Efsd")]
+    except Exception:
+        card['info_spans'], card['info_lines'] = [], []
+    return card
+
+
+def read_feed_cards(driver, feed=None, mode=None):
+    """Feed'deki tüm kartların ham alanlarını seçilen modda okur."""
+    if (mode or EXTRACTION_MODE) == 'batch':
+        try:
+            cards = driver.execute_script(FEED_CARDS_JS, feed)
+            if isinstance(cards, list):
+                return cards
+        except Exception as e:
+            print(f"Toplu kart okuma başarısız, tek tek okunuyor: {e}")
+
+    cards = []
+    for place in driver.find_elements(By.CSS_SELECTOR, "div.Nv2PK"):
+        try:
+            cards.append(read_feed_card_classic(place))
+        except Exception as e:
+            print(f"Kart okunamadı: {e}")
+            cards.append({})
+    return cards
+
+
+def extract_feed_cards(driver, feed=None, mode=None):
+    """Feed kartlarını kayıt listesine dönüştürür (isimsiz kartlar atlanır)."""
+    results = []
+    with timed(EXTRACT, 'extract', kind='cards'):
+        cards = read_feed_cards(driver, feed, mode)
+    for i, card in enumerate(cards, 1):
+        result = map_feed_card(card, i)
+        if result:
+            results.append(result)
+    return results
@@ -0,0 +1,211 @@
+"""
+Google Maps Scraper - HTTP Motoru
+İşletme sayfalarını tarayıcı açmadan, havuzlu bir HTTP istemcisiyle çeker
+ve sayfaya gömülü JSON verisini ayrıştırır. Ayrıştırılamayan sayfalar
+çağırana geri verilir; onlar Selenium ile çekilir.
+
+parse_place_html saf bir fonksiyondur; kaydedilmiş HTML ile denenebilir:
+    python http_engine.py kayitli_sayfa.html
+"""
+
+import re
+import sys
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+from extractors import apply_detail_fields, empty_result
+from metrics import EXTRACT, NAVIGATION, bind, timed
+
+# HTTP istemcisi (isteğe bağlı)
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# HTTP/2 için h2 paketi gerekir; yoksa HTTP/1.1 keep-alive kullanılır
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+REQUEST_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml',
+    'Accept-Language': 'tr-TR,tr;q=0.9',
+}
+
+# Çerez onay sayfasına yönlendirilmemek için
+CONSENT_COOKIES = {'CONSENT': 'YES+cb', 'SOCS': 'CAI'}
+
+STATE_RE = re.compile(r'window\.APP_INITIALIZATION_STATE\s*=\s*')
+
+# Gömülü JSON dizelerinin başındaki XSSI koruması
+XSSI_PREFIX = ")]}'"
+
+
+def _dig(data, *path):
+    """İç içe listelerde yolu izler; yol yoksa None döner."""
+    for key in path:
+        if not isinstance(data, list) or not -len(data) <= key < len(data):
+            return None
+        data = data[key]
+    return data
+
+
+def _embedded_payloads(node):
+    """Başlangıç durumundaki XSSI önekli JSON dizelerini çözerek döndürür."""
+    if isinstance(node, str):
+        if node.startswith(XSSI_PREFIX):
+            try:
+                yield json.loads(node[len(XSSI_PREFIX):])
+            except ValueError:
+                pass
+    elif isinstance(node, list):
+        for item in node:
+            yield from _embedded_payloads(item)
+
+
+def find_place_record(html):
+    """
+    Sayfadaki APP_INITIALIZATION_STATE içinden işletme dizisini bulur.
+    İşletme dizisi, payload[6] olup 11. elemanı isim olan listedir.
+    """
+    match = STATE_RE.search(html)
+    if not match:
+        return None
+    try:
+        state, _ = json.JSONDecoder().raw_decode(html, match.end())
+    except ValueError:
+        return None
+
+    for payload in _embedded_payloads(state):
+        record = _dig(payload, 6)
+        if isinstance(_dig(record, 11), str):
+            return record
+    return None
+
+
+def _website(value):
+    """Google yönlendirme linkinden (/url?q=...) asıl adresi çıkarır."""
+    if not isinstance(value, str) or not value:
+        return ''
+    if value.startswith('/url?'):
+        return parse_qs(urlparse(value).query).get('q', [''])[0]
+    return value
+
+
+def _hours(record):
+    """[gün, [saatler]] listesini {'Pazartesi': '09:00–19:00'} sözlüğüne çevirir."""
+    hours = {}
+    for day in _dig(record, 34, 1) or []:
+        name, times = _dig(day, 0), _dig(day, 1)
+        if isinstance(name, str) and isinstance(times, list):
+            hours[name] = ', '.join(t for t in times if isinstance(t, str))
+    return hours
+
+
+def parse_place_html(html, index, link):
+    """
+    İşletme sayfasının HTML'inden extract_detailed_data ile aynı biçimde
+    kayıt üretir. Gömülü veri bulunamazsa None döner.
+    """
+    record = find_place_record(html or '')
+    if record is None or not record[11]:
+        return None
+
+    rating = _dig(record, 4, 7)
+    reviews = _dig(record, 4, 8)
+    phone = _dig(record, 178, 0, 0)
+
+    # Selenium'un okuduğu etiket biçimine çevirip aynı eşlemeden geçir
+    fields = {
+        'isim': record[11],
+        'puan': f"{rating:.1f}".replace('.', ',') if isinstance(rating, (int, float)) else '',
+        'yorum_label': f"{reviews:,}".replace(',', '.') if isinstance(reviews, int) else None,
+        'adres_label': _dig(record, 39) if isinstance(_dig(record, 39), str) else None,
+        'telefon_label': phone if isinstance(phone, str) else None,
+        'website': _website(_dig(record, 7, 0)),
+    }
+    result = apply_detail_fields(empty_result(index, link), fields)
+
+    categories = _dig(record, 13)
+    if isinstance(categories, list):
+        result['kategori'] = ', '.join(c for c in categories if isinstance(c, str))
+    result['calisma_saatleri'] = _hours(record)
+    return result
+
+
+# --- ASENKRON İSTEMCİ ---
+
+async def _fetch_all(items, on_result, concurrency, timeout, should_stop, transport=None):
+    failed = []
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    loop = asyncio.get_running_loop()
+    # Depoya erişen geri çağrılar olay döngüsünü durdurmasın diye tek bir
+    # thread'de sırayla çalışır; ölçümler çağıranın işine yazılır
+    on_result = bind(on_result)
+    should_stop = should_stop and bind(should_stop)
+
+    with ThreadPoolExecutor(max_workers=1) as db:
+        async with httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE, limits=limits, timeout=timeout, headers=REQUEST_HEADERS,
+            cookies=CONSENT_COOKIES, follow_redirects=True, transport=transport
+        ) as client:
+
+            async def fetch(item):
+                index, link = item[0], item[1]
+                async with semaphore:
+                    if should_stop and await loop.run_in_executor(db, should_stop):
+                        failed.append(item)
+                        return
+                    try:
+                        with timed(NAVIGATION, 'navigate', kind='http'):
+                            response = await client.get(link)
+                        response.raise_for_status()
+                        with timed(EXTRACT, 'extract', kind='http'):
+                            result = parse_place_html(response.text, index, link)
+                    except Exception as e:
+                        print(f"HTTP hata (Index {index}): {e}")
+                        result = None
+                if result is None:
+                    failed.append(item)
+                else:
+                    await loop.run_in_executor(db, on_result, item, result)
+
+            await asyncio.gather(*(fetch(item) for item in items))
+
+    return failed
+
+
+def fetch_place_details(items, on_result, concurrency=8, timeout=15, should_stop=None,
+                        transport=None):
+    """
+    (index, link, ...) öğelerinin sayfalarını en fazla concurrency eşzamanlı
+    istekle çeker. Ayrıştırılan her kayıt için on_result(item, result) çağrılır
+    (sırayla, olay döngüsü dışındaki tek bir thread'de). Çekilemeyen veya
+    ayrıştırılamayan öğeler döner.
+    transport verilirse istekler ona gider (testlerde httpx.MockTransport).
+    """
+    if not HTTPX_AVAILABLE:
+        raise RuntimeError("httpx yüklü değil.")
+    if not items:
+        return []
+    return asyncio.run(
+        _fetch_all(items, on_result, max(1, concurrency), timeout, should_stop, transport)
+    )
+
+
+if __name__ == '__main__':
+    for path in sys.argv[1:]:
+        with open(path, encoding='utf-8') as f:
+            parsed = parse_place_html(f.read(), 1, path)
+        print(json.dumps(parsed, ensure_ascii=False, indent=2) if parsed else f"{path}: veri bulunamadı")
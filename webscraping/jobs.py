@@ -0,0 +1,546 @@
+﻿"""
+Google Maps Scraper - İş Kuyruğu
+Tüm Gunicorn worker'larının paylaştığı SQLite tabanlı iş deposu ve zamanlayıcı.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+
+from metrics import JobTimings
+from db import connect, init_database, rewrite_json_rows
+
+
+# İş durumları
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Bitmiş ama kaldığı yerden devam ettirilebilen durumlar
+RESUMABLE_STATES = (FAILED, CANCELLED)
+
+# JSON olarak saklanan alanlar
+JSON_FIELDS = ('workers', 'options', 'checkpoint', 'timings')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    location TEXT NOT NULL,
+    profession TEXT NOT NULL,
+    max_results INTEGER NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    total_found INTEGER NOT NULL DEFAULT 0,
+    workers TEXT NOT NULL DEFAULT '[]',
+    options TEXT NOT NULL DEFAULT '{}',
+    checkpoint TEXT NOT NULL DEFAULT '{}',
+    timings TEXT NOT NULL DEFAULT '{}',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    batch_id TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, priority, created_at);
+
+-- Sonuçlar yalnızca eklenir; seq işin içindeki geliş sırasıdır (1'den başlar)
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    sira INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_results_sira ON results (job_id, sira);
+"""
+
+# Durum sorgularında okunan sütunlar
+SUMMARY_COLUMNS = (
+    "id, status, priority, location, profession, max_results, progress, message,"
+    " total_found, workers, options, timings, attempts, batch_id, cancel_requested, owner, created_at,"
+    " started_at, finished_at, updated_at"
+)
+
+# Eski veritabanlarına sonradan eklenen sütunlar
+MIGRATIONS = {
+    'options': "TEXT NOT NULL DEFAULT '{}'",
+    'checkpoint': "TEXT NOT NULL DEFAULT '{}'",
+    'attempts': "INTEGER NOT NULL DEFAULT 0",
+    'batch_id': "TEXT",
+    'timings': "TEXT NOT NULL DEFAULT '{}'",
+}
+
+
+class JobStore:
+    """
+    İşlerin durumunu SQLite veritabanında tutar.
+    Aynı dosyayı kullanan tüm süreçler aynı kuyruğu görür.
+    """
+
+    def __init__(self, path, stale_after=600, max_attempts=3):
+        self.path = path
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+
+        init_database(path)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in MIGRATIONS.items():
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+            # Sonradan eklenen sütunların indeksleri
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs (batch_id)")
+
+    def _connect(self):
+        return connect(self.path, rows=True)
+
+    def _to_dict(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        for field in JSON_FIELDS:
+            if field in job:
+                job[field] = json.loads(job[field]) if job[field] else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        job['is_running'] = job['status'] in (QUEUED, RUNNING)
+        return job
+
+    # --- İş oluşturma ve okuma ---
+
+    def create(self, location, profession, max_results, priority=0, options=None, batch_id=None):
+        """
+        Yeni bir işi kuyruğa ekler ve kimliğini döndürür.
+        options: işe özel ayarlar (ör. {'mode': 'list'})
+        batch_id: toplu aramanın kimliği (varsa)
+        """
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, priority, location, profession, max_results,"
+                " options, batch_id, message, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, priority, location, profession, max_results,
+                 json.dumps(options or {}, ensure_ascii=False), batch_id,
+                 'Sırada bekliyor...', now, now)
+            )
+        return job_id
+
+    def create_done(self, location, profession, max_results, source_job_id, message, options=None,
+                    batch_id=None):
+        """
+        Sonucu hazır (ör. önbellekten gelen) bir işi tamamlanmış olarak ekler.
+        Sonuçlar source_job_id işinin sıra numarası max_results'u geçmeyen
+        kayıtlarıdır; veritabanı içinde kopyalanır. Kopyalanacak sonuç
+        yoksa iş eklenmez ve None döner.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            copied = conn.execute(
+                "INSERT INTO results (job_id, seq, sira, data, created_at)"
+                " SELECT ?, ROW_NUMBER() OVER (ORDER BY sira, seq), sira, data, ? FROM results"
+                " WHERE job_id = ? AND sira <= ?",
+                (job_id, now, source_job_id, max_results)
+            ).rowcount
+            if not copied:
+                conn.execute("ROLLBACK")
+                return None
+            conn.execute(
+                "INSERT INTO jobs (id, status, location, profession, max_results, options, batch_id,"
+                " progress, message, total_found, created_at, started_at, finished_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, 100, ?, ?, ?, ?, ?, ?)",
+                (job_id, DONE, location, profession, max_results,
+                 json.dumps(options or {}, ensure_ascii=False), batch_id, message, copied,
+                 now, now, now, now)
+            )
+            conn.execute("COMMIT")
+        return job_id
+
+    def get(self, job_id):
+        """İşin durumunu sözlük olarak döndürür, yoksa None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._to_dict(row)
+
+    def latest(self):
+        """En son oluşturulan işi döndürür."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM jobs ORDER BY created_at DESC LIMIT 1"
+            ).fetchone()
+        return self._to_dict(row)
+
+    # --- Sonuçlar ---
+
+    def append_result(self, job_id, record):
+        """
+        Sonucu işin sonuç kaydına ekler ve işin toplam sonuç sayısını döndürür.
+        Her kayıt geldiği anda diske yazılır; önceki kayıtlar yeniden yazılmaz.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) + 1 FROM results WHERE job_id = ?", (job_id,)
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO results (job_id, seq, sira, data, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, seq, record.get('sira') or 0, json.dumps(record, ensure_ascii=False), now)
+                )
+                conn.execute(
+                    "UPDATE jobs SET total_found = ?, updated_at = ? WHERE id = ?", (seq, now, job_id)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return seq
+
+    def get_results(self, job_id, offset=0, limit=None):
+        """İşin sonuçlarını geliş sırasıyla, offset'ten itibaren döndürür."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT data FROM results WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, offset, -1 if limit is None else limit)
+            ).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def result_links(self, job_id):
+        """İş için kaydedilmiş sonuçların linklerini döndürür."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM results WHERE job_id = ?", (job_id,)).fetchall()
+        return {json.loads(row['data']).get('link') for row in rows}
+
+    def iter_results(self, job_id, by_sira=True):
+        """Sonuçları tek tek okuyan generator; tüm liste belleğe alınmaz."""
+        order = "sira, seq" if by_sira else "seq"
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"SELECT data FROM results WHERE job_id = ? ORDER BY {order}", (job_id,)
+            )
+            for row in cursor:
+                yield json.loads(row['data'])
+
+    def batch_jobs(self, batch_id):
+        """Toplu aramanın işlerini oluşturulma sırasıyla döndürür."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM jobs WHERE batch_id = ? ORDER BY created_at, rowid",
+                (batch_id,)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def iter_batch_results(self, batch_id):
+        """Toplu aramadaki tüm işlerin sonuçlarını iş sırasıyla okuyan generator."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT r.data FROM results r JOIN jobs j ON j.id = r.job_id"
+                " WHERE j.batch_id = ? ORDER BY j.created_at, j.rowid, r.sira, r.seq",
+                (batch_id,)
+            )
+            for row in cursor:
+                yield json.loads(row['data'])
+
+    def rewrite_results(self, transform, batch_size=1000):
+        """
+        Kayıtlı tüm sonuçları batch_size'lık gruplar halinde transform(kayıtlar)
+        fonksiyonundan geçirip yeniden yazar (ör. telefon analizi kuralları
+        değiştiğinde). Değişen kayıt sayısını döndürür.
+        """
+        with self._connect() as conn:
+            return rewrite_json_rows(conn, 'results', 'rowid', 'data', transform, batch_size)
+
+    def recent(self, limit=50):
+        """Son işleri sonuçları olmadan listeler."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, status, priority, location, profession, max_results, progress,"
+                " message, total_found, created_at, started_at, finished_at"
+                " FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def queue_position(self, job_id):
+        """Bekleyen iş için kuyruktaki sırasını döndürür (1'den başlar)."""
+        job = self.get(job_id)
+        if not job or job['status'] != QUEUED:
+            return 0
+        with self._connect() as conn:
+            ahead = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND"
+                " (priority > ? OR (priority = ? AND created_at < ?))",
+                (QUEUED, job['priority'], job['priority'], job['created_at'])
+            ).fetchone()[0]
+        return ahead + 1
+
+    # --- Güncelleme ---
+
+    def update(self, job_id, **fields):
+        """İşin verilen alanlarını günceller."""
+        if not fields:
+            return
+        for field in JSON_FIELDS:
+            if field in fields:
+                fields[field] = json.dumps(fields[field], ensure_ascii=False)
+        fields['updated_at'] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def finish(self, job_id, status, message):
+        """İşi bitmiş olarak işaretler. Tamamlanan işin kontrol noktası silinir."""
+        fields = {'checkpoint': {}} if status == DONE else {}
+        self.update(job_id, status=status, message=message, finished_at=time.time(), **fields)
+
+    def cancel(self, job_id):
+        """
+        İşi iptal eder. Bekleyen iş hemen iptal edilir,
+        çalışan işe iptal isteği bırakılır. İş bulunamazsa False döner.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row['status'] in FINISHED_STATES:
+                conn.execute("COMMIT")
+                return False
+            if row['status'] == QUEUED:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, message = ?, finished_at = ?, updated_at = ?"
+                    " WHERE id = ?", (CANCELLED, 'İptal edildi.', now, now, job_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ?",
+                    (now, job_id)
+                )
+            conn.execute("COMMIT")
+        return True
+
+    # --- Kontrol noktaları ---
+
+    def get_checkpoint(self, job_id):
+        """İşin son kontrol noktasını döndürür (yoksa boş sözlük)."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT checkpoint FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row['checkpoint']) if row and row['checkpoint'] else {}
+
+    def resume(self, job_id):
+        """
+        Başarısız veya iptal edilmiş işi kontrol noktası ve sonuçlarıyla
+        birlikte yeniden kuyruğa alır. İş devam ettirilemezse False döner.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, cancel_requested = 0, attempts = 0,"
+                " owner = NULL, finished_at = NULL, updated_at = ?"
+                f" WHERE id = ? AND status IN ({', '.join('?' * len(RESUMABLE_STATES))})",
+                (QUEUED, 'Kaldığı yerden devam edecek...', now, job_id, *RESUMABLE_STATES)
+            )
+        return cursor.rowcount > 0
+
+    def retry_or_fail(self, job_id, message):
+        """
+        Hata alan işi deneme hakkı kaldıysa kontrol noktasından devam etmek
+        üzere kuyruğa geri koyar, yoksa başarısız olarak kapatır.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, owner = NULL, updated_at = ?"
+                " WHERE id = ? AND attempts < ? AND cancel_requested = 0",
+                (QUEUED, f"{message} Kaldığı yerden devam edecek...", now, job_id, self.max_attempts)
+            )
+        if cursor.rowcount == 0:
+            self.finish(job_id, FAILED, message)
+
+    def is_cancel_requested(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    # --- Zamanlama ---
+
+    def claim_next(self, owner, max_running, policy='priority'):
+        """
+        Kuyruktaki sıradaki işi atomik olarak sahiplenir.
+        Toplam çalışan iş sayısı max_running'e ulaştıysa None döner.
+        """
+        order = "priority DESC, created_at ASC" if policy == 'priority' else "created_at ASC"
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Sahibi ölmüş (uzun süredir güncellenmeyen) işler deneme hakkı
+                # kaldıysa kontrol noktasından devam etmek üzere kuyruğa döner
+                conn.execute(
+                    "UPDATE jobs SET status = ?, message = ?, owner = NULL, updated_at = ?"
+                    " WHERE status = ? AND updated_at < ? AND attempts < ?",
+                    (QUEUED, 'Kaldığı yerden devam edecek...', now,
+                     RUNNING, now - self.stale_after, self.max_attempts)
+                )
+                conn.execute(
+                    "UPDATE jobs SET status = ?, message = ?, finished_at = ?, updated_at = ?"
+                    " WHERE status = ? AND updated_at < ?",
+                    (FAILED, 'İş yanıt vermeyi bıraktı.', now, now, RUNNING, now - self.stale_after)
+                )
+
+                running = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ?", (RUNNING,)
+                ).fetchone()[0]
+                if running >= max_running:
+                    conn.execute("COMMIT")
+                    return None
+
+                row = conn.execute(
+                    f"SELECT * FROM jobs WHERE status = ? ORDER BY {order} LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, message = ?, attempts = attempts + 1,"
+                    " started_at = COALESCE(started_at, ?), updated_at = ? WHERE id = ?",
+                    (RUNNING, owner, 'Tarayıcı hazırlanıyor...', now, now, row['id'])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        return self.get(row['id'])
+
+
+class JobHandle:
+    """
+    Çalışan tek bir işin durumu.
+    Değişiklikler hem bellekte tutulur hem de depoya yazılır.
+    """
+
+    def __init__(self, store, job):
+        self.store = store
+        self.id = job['id']
+        self.location = job['location']
+        self.profession = job['profession']
+        self.max_results = job['max_results']
+        self.options = job['options'] or {}
+        self.checkpoint = store.get_checkpoint(self.id)
+        # Yeniden başlayan iş önceki denemelerin sürelerine eklenir
+        self.timings = JobTimings(job.get('timings'))
+        self.status = {
+            'progress': 0,
+            'message': job['message'],
+            'total_found': job['total_found'],
+            'workers': []
+        }
+
+    def update(self, **fields):
+        self.status.update(fields)
+        self.store.update(self.id, timings=self.timings.snapshot(), **fields)
+
+    def save_timings(self):
+        """Süre dökümünü son haliyle depoya yazar."""
+        self.store.update(self.id, timings=self.timings.snapshot())
+
+    def save_checkpoint(self, **fields):
+        """Kontrol noktasını günceller; iş yeniden başlarsa buradan devam eder."""
+        self.checkpoint.update(fields)
+        self.store.update(self.id, checkpoint=self.checkpoint)
+
+    def add_result(self, record):
+        """Sonucu kalıcı sonuç kaydına ekler."""
+        self.status['total_found'] = self.store.append_result(self.id, record)
+
+    def is_cancelled(self):
+        return self.store.is_cancel_requested(self.id)
+
+
+class JobScheduler:
+    """
+    Kuyruktaki işleri arka plan thread'lerinde çalıştırır.
+    Her süreç kendi zamanlayıcısını çalıştırır; eşzamanlılık sınırı
+    depo üzerinden tüm süreçler için ortaktır.
+    """
+
+    def __init__(self, store, runner, concurrency=2, policy='priority', poll_interval=1.0):
+        self.store = store
+        self.runner = runner
+        self.concurrency = max(1, concurrency)
+        self.policy = policy
+        self.poll_interval = poll_interval
+        self._reset()
+
+        # Gunicorn --preload: her worker kendi sahip kimliği ve thread'iyle başlar
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._active = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def ensure_started(self):
+        """Zamanlayıcı thread'ini (henüz yoksa) başlatır."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """Yeni iş eklendiğinde beklemeden kuyruğa bakılmasını sağlar."""
+        self._wakeup.set()
+
+    def _loop(self):
+        while True:
+            try:
+                self._dispatch()
+            except Exception as e:
+                print(f"Zamanlayıcı hatası: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                if len(self._active) >= self.concurrency:
+                    return
+            job = self.store.claim_next(self.owner, self.concurrency, self.policy)
+            if job is None:
+                return
+            with self._lock:
+                self._active.add(job['id'])
+            thread = threading.Thread(target=self._run, args=(job,), daemon=True)
+            thread.start()
+
+    def _run(self, job):
+        try:
+            self.runner(JobHandle(self.store, job))
+        except Exception as e:
+            self.store.finish(job['id'], FAILED, f"Hata oluştu: {str(e)}")
+        finally:
+            with self._lock:
+                self._active.discard(job['id'])
+            self.notify()
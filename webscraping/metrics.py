@@ -0,0 +1,263 @@
+"""
+Google Maps Scraper - Metrikler
+Süreç içi sayaç ve histogramlar (Prometheus metin biçiminde /metrics) ile
+iş başına aşama süresi dökümü.
+
+Ölçüm noktaları süreyi hem süreç metriğine hem de o thread'de çalışan işin
+dökümüne (JobTimings) yazar. İşin thread'i bind_timings ile bağlanır; başka
+thread'lere verilen fonksiyonlar bind ile sarılarak aynı işe bağlı kalır.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+
+# Saniye cinsinden varsayılan histogram aralıkları
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Bekleme sayılan aşamalar; geri kalanı iş sayılır
+WAIT_STAGES = ('wait',)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Etiketli metriklerin ortak kısmı."""
+
+    kind = ''
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} etiketleri: {', '.join(self.labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+
+class Counter(Metric):
+    """Yalnızca artan sayaç."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"]
+
+
+class Histogram(Metric):
+    """Gözlemleri aralıklara (bucket) dağıtan histogram."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            buckets, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    buckets[i] += 1
+            self._values[key] = (buckets, total + value, count + 1)
+
+    def _render_value(self, key, value):
+        buckets, total, count = value
+        lines = [
+            f"{self.name}_bucket{_format_labels(self.labels, key, [('le', _format_value(float(bound)))])} {n}"
+            for bound, n in zip(self.buckets, buckets)
+        ]
+        lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', '+Inf')])} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Süreçteki metriklerin listesi."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Prometheus metin biçimi (0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def counter(name, help_text, labels=()):
+    return REGISTRY.register(Counter(name, help_text, labels))
+
+
+def histogram(name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, help_text, labels, buckets))
+
+
+# --- SCRAPER METRİKLERİ ---
+
+DRIVER_STARTUP = histogram('scraper_driver_startup_seconds', "Chrome sürücüsü başlatma süresi")
+NAVIGATION = histogram('scraper_navigation_seconds', "Sayfa açma süresi", ('kind',))
+WAIT = histogram('scraper_wait_seconds', "DOM ve liste olaylarını bekleme süresi", ('kind',))
+EXTRACT = histogram(
+    'scraper_extract_seconds', "Sayfadan veri okuma (tarayıcı gidiş-dönüş) süresi", ('kind',),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+PERSIST = histogram(
+    'scraper_persist_seconds', "Bir sonucu depoya, dosyaya ve indekse yazma süresi",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+)
+EXPORT = histogram('scraper_export_seconds', "Dışa aktarma süresi", ('format',))
+JOB_DURATION = histogram('scraper_job_duration_seconds', "İş başına toplam süre")
+PAGES = counter('scraper_pages_total', "Çekilen işletme sayfaları", ('engine', 'status'))
+FIELD_MISSING = counter(
+    'scraper_field_missing_total', "İşletme sayfasında bulunamayan alanlar (seçici başına)", ('field',)
+)
+JOBS = counter('scraper_jobs_total', "Biten işler", ('status',))
+BLOCKED_PAGES = counter(
+    'scraper_blocked_pages_total', "Onay veya captcha sayfasına düşen işletme sayfaları", ('reason',)
+)
+
+
+# --- İŞ BAŞINA DÖKÜM ---
+
+class JobTimings:
+    """
+    Bir işin aşama süreleri ({aşama: saniye, adet}), sayfa sayısı ve duvar
+    saati süresi. Paralel işçilerin süreleri toplandığından aşama toplamı
+    duvar saatini geçebilir (işçi-saniye).
+    """
+
+    def __init__(self, data=None):
+        data = data or {}
+        self._stages = {
+            stage: {'seconds': values.get('seconds', 0.0), 'count': values.get('count', 0)}
+            for stage, values in (data.get('stages') or {}).items()
+        }
+        self._pages = data.get('pages', 0)
+        self._failures = data.get('failures', 0)
+        self._previous_wall = data.get('wall_seconds', 0.0)
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            values = self._stages.setdefault(stage, {'seconds': 0.0, 'count': 0})
+            values['seconds'] += seconds
+            values['count'] += 1
+
+    def page(self, ok=True):
+        with self._lock:
+            if ok:
+                self._pages += 1
+            else:
+                self._failures += 1
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                stage: {'seconds': round(values['seconds'], 3), 'count': values['count']}
+                for stage, values in self._stages.items()
+            }
+            pages, failures = self._pages, self._failures
+        wall = self._previous_wall + time.monotonic() - self._started
+        wait = sum(values['seconds'] for stage, values in stages.items() if stage in WAIT_STAGES)
+        return {
+            'stages': stages,
+            'wall_seconds': round(wall, 3),
+            'wait_seconds': round(wait, 3),
+            'work_seconds': round(sum(v['seconds'] for v in stages.values()) - wait, 3),
+            'pages': pages,
+            'failures': failures,
+            'pages_per_sec': round(pages / wall, 3) if wall > 0 else 0.0
+        }
+
+
+_local = threading.local()
+
+
+def bind_timings(timings):
+    """Bu thread'deki ölçümleri verilen işin dökümüne bağlar (None: bağı kaldırır)."""
+    _local.timings = timings
+
+
+def current_timings():
+    return getattr(_local, 'timings', None)
+
+
+def bind(func):
+    """func'ı, çağıran thread'in iş dökümüne bağlı çalışacak şekilde sarar."""
+    timings = current_timings()
+
+    def wrapper(*args, **kwargs):
+        previous = current_timings()
+        bind_timings(timings)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            bind_timings(previous)
+    return wrapper
+
+
+def observe(metric, seconds, stage=None, **labels):
+    """Süreyi histograma ve (stage verilmişse) bağlı işin dökümüne yazar."""
+    metric.observe(seconds, **labels)
+    timings = current_timings()
+    if stage and timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def timed(metric, stage=None, **labels):
+    """Blok süresini observe ile kaydeder (hata olsa da)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(metric, time.perf_counter() - started, stage, **labels)
+
+
+def count_page(engine, ok):
+    """Çekilen (veya çekilemeyen) işletme sayfasını sayar."""
+    PAGES.inc(engine=engine, status='ok' if ok else 'error')
+    timings = current_timings()
+    if timings is not None:
+        timings.page(ok)
@@ -0,0 +1,158 @@
+"""
+Google Maps Scraper - Hız Denetimi
+Sürücü başına AIMD hız denetleyicisi ve başarısız linkleri başka işçiye
+veren detay kuyruğu.
+
+Sağlıklı sayfalarda hız adım adım artar, boş/engellenmiş sayfada veya
+gecikme olağan düzeyin çok üstüne çıktığında yarıya iner.
+"""
+
+import time
+import threading
+from collections import deque
+
+
+class AIMDPacer:
+    """
+    Sayfa açma hızını (sayfa/saniye) toplamsal artış, çarpımsal azalış
+    (AIMD) ile ayarlar. wait() bir önceki açılıştan bu yana 1/hız saniye
+    geçmediyse aradaki süre kadar bekler.
+    """
+
+    def __init__(self, max_rate, min_rate, increase=0.25, decrease=0.5,
+                 latency_factor=2.5, alpha=0.2):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.alpha = alpha
+        self.rate = max_rate
+        self.latency = None
+        self.failure_rate = 0.0
+        self._last_start = None
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Sıradaki sayfa açılmadan önce gereken kadar bekler; beklenen süreyi döndürür."""
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self._last_start is not None:
+                delay = max(0.0, 1.0 / self.rate - (now - self._last_start))
+            self._last_start = now + delay
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def record(self, latency, ok):
+        """
+        Sayfanın sonucunu kaydeder. Boş/engellenmiş sayfa veya olağan
+        gecikmenin latency_factor katını aşan gecikme hızı düşürür.
+        Gecikme ölçülemediyse (None) yalnızca sonuç dikkate alınır.
+        """
+        with self._lock:
+            self.failure_rate = self.alpha * (0 if ok else 1) + (1 - self.alpha) * self.failure_rate
+            measured = latency is not None
+            slow = (ok and measured and self.latency is not None
+                    and latency > self.latency * self.latency_factor)
+            if ok and not slow:
+                if measured:
+                    self.latency = latency if self.latency is None else (
+                        self.alpha * latency + (1 - self.alpha) * self.latency
+                    )
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            else:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+
+
+class LinkQueue:
+    """
+    İşçilerin paylaştığı detay linki kuyruğu.
+    Çekilemeyen link, denemeyen bir işçiye max_attempts kez verilir.
+    Başka işçilerde çekilmekte olan link varken get bekler; böylece
+    yeniden denenecek linkler boşta kalan işçilere de ulaşır.
+    """
+
+    def __init__(self, items, workers, max_attempts=2):
+        self.max_attempts = max(1, max_attempts)
+        self._items = deque(items)
+        self._tried = {}
+        self._active = set(range(workers))
+        self._held = {}
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def _take(self, worker_id):
+        for item in self._items:
+            if worker_id not in self._tried.get(item[0], ()):
+                self._items.remove(item)
+                self._held.setdefault(worker_id, []).append(item)
+                self._in_flight += 1
+                return item
+        return None
+
+    def _release(self, worker_id, item):
+        held = self._held.get(worker_id, [])
+        if item in held:
+            held.remove(item)
+            self._in_flight -= 1
+
+    def _requeue(self, worker_id, item):
+        """Linki işçinin denemesi sayıp kuyruğa geri koyar; koyamazsa False döner."""
+        tried = self._tried.setdefault(item[0], set())
+        tried.add(worker_id)
+        requeued = len(tried) < self.max_attempts and bool(self._active - tried)
+        if requeued:
+            self._items.append(item)
+        return requeued
+
+    def get(self, worker_id, block=True):
+        """
+        İşçinin denemediği sıradaki linki döndürür. Kalmadıysa (block=True
+        iken başka işçilerde de çekilen link yoksa) None döner.
+        """
+        with self._cond:
+            while True:
+                item = self._take(worker_id)
+                if item is not None or not block or not self._in_flight:
+                    return item
+                self._cond.wait()
+
+    def done(self, worker_id, item):
+        """Link sonuçlandı (başarılı veya son deneme)."""
+        with self._cond:
+            self._release(worker_id, item)
+            self._cond.notify_all()
+
+    def retry(self, worker_id, item):
+        """
+        Çekilemeyen linki, denemeyen etkin bir işçi varsa kuyruğa geri koyar.
+        Geri konduysa True döner; False ise link son haliyle sonuçlanmıştır.
+        """
+        with self._cond:
+            self._release(worker_id, item)
+            requeued = self._requeue(worker_id, item)
+            self._cond.notify_all()
+            return requeued
+
+    def leave(self, worker_id):
+        """
+        İşçi çıktı (iş bitti, iptal edildi veya sürücü çöktü). Elindeki
+        linkler başarısız deneme sayılıp diğer işçilere verilir. Artık hiçbir
+        etkin işçinin alamayacağı linkler kuyruktan çıkarılıp döndürülür;
+        çağıran bunları çekilemedi olarak sonuçlandırır.
+        """
+        with self._cond:
+            self._active.discard(worker_id)
+            dropped = []
+            for item in self._held.pop(worker_id, []):
+                self._in_flight -= 1
+                if not self._requeue(worker_id, item):
+                    dropped.append(item)
+            for item in list(self._items):
+                if not self._active - self._tried.get(item[0], set()):
+                    self._items.remove(item)
+                    dropped.append(item)
+            self._cond.notify_all()
+            return dropped
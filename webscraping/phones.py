@@ -0,0 +1,242 @@
+"""
+Google Maps Scraper - Telefon Numaraları
+Telefon numaralarını ülkeye, hat türüne (mobil, sabit, servis, ücretsiz) ve
+Türkiye'de alan koduna göre sınıflandırır. Önek tabloları modül yüklenirken
+sözlüklere derlenir; toplu analizde aynı numara yalnızca bir kez işlenir.
+
+Kurallar değiştiğinde kayıtlı sonuçlara yeniden uygulamak için:
+    python phones.py sonuclar_*.json --jobs-db data/jobs.db --index-db data/places.db
+"""
+
+import os
+import re
+import json
+import argparse
+
+
+# Hat türleri
+MOBILE = 'mobile'
+LANDLINE = 'landline'
+SERVICE = 'service'
+TOLL_FREE = 'tollfree'
+UNKNOWN = 'unknown'
+
+# Ülke koduyla yazılmamış numaraların varsayılan ülkesi
+DEFAULT_COUNTRY_CODE = '90'
+
+# Ülke kodu: (ülke, ulusal numara uzunluğu (en az, en çok), {önek: hat türü})
+# En uzun eşleşen önek geçerlidir. Uzun numaralar dahili numara vb.
+# fazlalıklar atılarak kırpılır; en az uzunluktan kısa numara mobil sayılmaz.
+COUNTRIES = {
+    '90': ('TR', (10, 10), {'5': MOBILE, '444': SERVICE, '850': SERVICE, '800': TOLL_FREE}),
+    '44': ('GB', (10, 10), {'7': MOBILE, '1': LANDLINE, '2': LANDLINE, '80': TOLL_FREE,
+                            '3': SERVICE, '84': SERVICE, '87': SERVICE}),
+    '49': ('DE', (10, 11), {'15': MOBILE, '16': MOBILE, '17': MOBILE, '800': TOLL_FREE, '180': SERVICE,
+                            **{d: LANDLINE for d in '23456789'}}),
+    '33': ('FR', (9, 9), {'6': MOBILE, '7': MOBILE, '80': TOLL_FREE, **{d: LANDLINE for d in '12345'}}),
+    '31': ('NL', (9, 9), {'6': MOBILE, '800': TOLL_FREE, **{d: LANDLINE for d in '123457'}}),
+    '32': ('BE', (9, 9), {'4': MOBILE, '800': TOLL_FREE, **{d: LANDLINE for d in '1235679'}}),
+    '43': ('AT', (10, 13), {'6': MOBILE, '800': TOLL_FREE, **{d: LANDLINE for d in '123457'}}),
+    '41': ('CH', (9, 9), {'7': MOBILE, '800': TOLL_FREE, **{d: LANDLINE for d in '234568'}}),
+    '39': ('IT', (9, 11), {'3': MOBILE, '0': LANDLINE, '800': TOLL_FREE}),
+    '34': ('ES', (9, 9), {'6': MOBILE, '7': MOBILE, '8': LANDLINE, '9': LANDLINE, '900': TOLL_FREE}),
+    '30': ('GR', (10, 10), {'69': MOBILE, '2': LANDLINE, '800': TOLL_FREE}),
+    '359': ('BG', (8, 9), {'87': MOBILE, '88': MOBILE, '89': MOBILE, '2': LANDLINE}),
+    '357': ('CY', (8, 8), {'9': MOBILE, '2': LANDLINE}),
+    '994': ('AZ', (9, 9), {'50': MOBILE, '51': MOBILE, '55': MOBILE, '70': MOBILE, '77': MOBILE,
+                           '99': MOBILE, '12': LANDLINE}),
+    '7': ('RU', (10, 10), {'9': MOBILE, '3': LANDLINE, '4': LANDLINE, '8': LANDLINE}),
+    '966': ('SA', (9, 9), {'5': MOBILE, '1': LANDLINE}),
+    '971': ('AE', (9, 9), {'5': MOBILE, '2': LANDLINE, '4': LANDLINE, '800': TOLL_FREE}),
+    # Kuzey Amerika'da mobil ve sabit hatlar önekten ayırt edilemez
+    '1': ('US', (10, 10), {'800': TOLL_FREE, '888': TOLL_FREE, '877': TOLL_FREE}),
+}
+
+# Türkiye sabit hat alan kodları
+TR_AREA_CODES = {
+    '212': 'İstanbul (Avrupa)', '216': 'İstanbul (Anadolu)', '222': 'Eskişehir', '224': 'Bursa',
+    '226': 'Yalova', '228': 'Bilecik', '232': 'İzmir', '236': 'Manisa', '242': 'Antalya',
+    '246': 'Isparta', '248': 'Burdur', '252': 'Muğla', '256': 'Aydın', '258': 'Denizli',
+    '262': 'Kocaeli', '264': 'Sakarya', '266': 'Balıkesir', '272': 'Afyonkarahisar',
+    '274': 'Kütahya', '276': 'Uşak', '282': 'Tekirdağ', '284': 'Edirne', '286': 'Çanakkale',
+    '288': 'Kırklareli', '312': 'Ankara', '318': 'Kırıkkale', '322': 'Adana', '324': 'Mersin',
+    '326': 'Hatay', '328': 'Osmaniye', '332': 'Konya', '338': 'Karaman', '342': 'Gaziantep',
+    '344': 'Kahramanmaraş', '346': 'Sivas', '348': 'Kilis', '352': 'Kayseri', '354': 'Yozgat',
+    '356': 'Tokat', '358': 'Amasya', '362': 'Samsun', '364': 'Çorum', '366': 'Kastamonu',
+    '368': 'Sinop', '370': 'Karabük', '372': 'Zonguldak', '374': 'Bolu', '376': 'Çankırı',
+    '378': 'Bartın', '380': 'Düzce', '382': 'Aksaray', '384': 'Nevşehir', '386': 'Kırşehir',
+    '388': 'Niğde', '392': 'KKTC', '412': 'Diyarbakır', '414': 'Şanlıurfa', '416': 'Adıyaman',
+    '422': 'Malatya', '424': 'Elazığ', '426': 'Bingöl', '428': 'Tunceli', '432': 'Van',
+    '434': 'Bitlis', '436': 'Muş', '438': 'Hakkari', '442': 'Erzurum', '446': 'Erzincan',
+    '452': 'Ordu', '454': 'Giresun', '456': 'Gümüşhane', '458': 'Bayburt', '462': 'Trabzon',
+    '464': 'Rize', '466': 'Artvin', '472': 'Ağrı', '474': 'Kars', '476': 'Iğdır',
+    '478': 'Ardahan', '482': 'Mardin', '484': 'Siirt', '486': 'Şırnak', '488': 'Batman',
+}
+
+NON_DIGIT_RE = re.compile(r'[^0-9]')
+
+
+def _compile_prefixes():
+    """(ülke kodu + önek) -> (ülke, hat türü) tablosunu ve önek uzunluklarını üretir."""
+    table = {}
+    for code, (country, _, prefixes) in COUNTRIES.items():
+        for prefix, line_type in prefixes.items():
+            table[code + prefix] = (country, line_type)
+    for area in TR_AREA_CODES:
+        table['90' + area] = ('TR', LANDLINE)
+    lengths = sorted({len(key) for key in table}, reverse=True)
+    return table, lengths
+
+
+PREFIX_TABLE, PREFIX_LENGTHS = _compile_prefixes()
+CALLING_CODE_LENGTHS = sorted({len(code) for code in COUNTRIES})
+
+
+def split_number(phone, default_code=DEFAULT_COUNTRY_CODE):
+    """
+    Numarayı (rakamlar, ülke kodu, ulusal numara) olarak ayırır.
+    + veya 00 ile başlayanlar uluslararası, 0 ile başlayanlar varsayılan
+    ülkenin ulusal biçimi sayılır. Ülke kodu bulunamazsa ('', '') döner.
+    """
+    cleaned = NON_DIGIT_RE.sub('', phone)
+    international = phone.lstrip().startswith('+') or cleaned.startswith('00')
+    digits = cleaned[2:] if cleaned.startswith('00') else cleaned
+
+    if not international:
+        # Eski kayıtlardaki + işaretsiz Türkiye numaraları (90 5xx ...)
+        if default_code == '90' and digits.startswith('90') and len(digits) >= 12:
+            return cleaned, '90', digits[2:]
+        return cleaned, default_code, digits[1:] if digits.startswith('0') else digits
+
+    for length in CALLING_CODE_LENGTHS:
+        if digits[:length] in COUNTRIES:
+            return cleaned, digits[:length], digits[length:]
+    return cleaned, '', ''
+
+
+def _classify(code, national):
+    """Ülke kodu ve ulusal numaradan (ülke, hat türü) döndürür."""
+    number = code + national
+    for length in PREFIX_LENGTHS:
+        if length <= len(number) and number[:length] in PREFIX_TABLE:
+            return PREFIX_TABLE[number[:length]]
+    country = COUNTRIES.get(code)
+    return (country[0] if country else '', UNKNOWN)
+
+
+def analyze_phone_number(phone, default_code=DEFAULT_COUNTRY_CODE):
+    """
+    Telefon numarasını analiz eder ve WhatsApp linki oluşturur.
+    formatted numaranın rakamlarıdır; e164, ülke, hat türü ve (Türkiye sabit
+    hatlarında) alan kodu ili de döner.
+    """
+    if not phone:
+        return {'is_mobile': False, 'formatted': '', 'whatsapp_link': '', 'display': '',
+                'e164': '', 'country': '', 'type': '', 'area': ''}
+
+    cleaned, code, national = split_number(phone, default_code)
+    country, line_type = _classify(code, national) if national else ('', UNKNOWN)
+    is_mobile = False
+    if code in COUNTRIES:
+        min_length, max_length = COUNTRIES[code][1]
+        national = national[:max_length]
+        is_mobile = line_type == MOBILE and len(national) >= min_length
+    e164 = f"+{code}{national}" if code and national else ''
+    area = TR_AREA_CODES.get(national[:3], '') if code == '90' and line_type == LANDLINE else ''
+
+    return {
+        'is_mobile': is_mobile,
+        'formatted': cleaned,
+        'whatsapp_link': f"https://wa.me/{code}{national}" if is_mobile else '',
+        'display': phone,
+        'e164': e164,
+        'country': country,
+        'type': line_type,
+        'area': area
+    }
+
+
+def analyze_phone_numbers(phones, default_code=DEFAULT_COUNTRY_CODE):
+    """
+    Bir numara sütununu toplu analiz eder; sonuçlar aynı sırayla döner.
+    Tekrarlanan numaralar bir kez analiz edilip sonucun kopyası kullanılır.
+    """
+    seen = {}
+    results = []
+    for phone in phones:
+        key = phone or ''
+        info = seen.get(key)
+        if info is None:
+            info = seen[key] = analyze_phone_number(key, default_code)
+        results.append(dict(info))
+    return results
+
+
+def reanalyze_records(records, default_code=DEFAULT_COUNTRY_CODE):
+    """
+    Kayıtların telefon_bilgi alanını güncel kurallarla yeniden hesaplar.
+    Kayıtlar yerinde güncellenir ve liste olarak döner.
+    """
+    records = list(records)
+    with_phone = [record for record in records if record.get('telefon')]
+    infos = analyze_phone_numbers((record['telefon'] for record in with_phone), default_code)
+    for record, info in zip(with_phone, infos):
+        record['telefon_bilgi'] = info
+    return records
+
+
+def reanalyze_file(path, default_code=DEFAULT_COUNTRY_CODE):
+    """
+    Sonuç dosyasını (liste, {'sonuclar': [...]} veya JSON Lines) yeniden
+    analiz edip yerinde yazar. Kayıt sayısını döndürür.
+    """
+    with open(path, encoding='utf-8-sig') as f:
+        if path.endswith('.jsonl'):
+            data = [json.loads(line) for line in f if line.strip()]
+        else:
+            data = json.load(f)
+
+    records = data.get('sonuclar', []) if isinstance(data, dict) else data
+    reanalyze_records(records, default_code)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Telefon analizini kayıtlı sonuçlara tarama yapmadan yeniden uygular."
+    )
+    parser.add_argument('files', nargs='*', help="sonuclar_*.json, *.jsonl veya son_arama.json dosyaları")
+    parser.add_argument('--jobs-db', help="İş veritabanı (jobs.db) sonuçları")
+    parser.add_argument('--index-db', help="Ana işletme indeksi (places.db)")
+    parser.add_argument('--cache-db', help="İşletme detay önbelleği (cache.db)")
+    parser.add_argument('--country-code', default=DEFAULT_COUNTRY_CODE,
+                        help="Ülke kodu yazılmamış numaraların ülke kodu (varsayılan: 90)")
+    args = parser.parse_args()
+
+    def transform(records):
+        return reanalyze_records(records, args.country_code)
+
+    for path in args.files:
+        try:
+            print(f"{path}: {reanalyze_file(path, args.country_code)} kayıt güncellendi")
+        except Exception as e:
+            print(f"{path} güncellenemedi: {e}")
+
+    if args.jobs_db:
+        from jobs import JobStore
+        print(f"{args.jobs_db}: {JobStore(args.jobs_db).rewrite_results(transform)} sonuç güncellendi")
+    if args.index_db:
+        from places import PlaceIndex
+        print(f"{args.index_db}: {PlaceIndex(args.index_db).rewrite_places(transform)} işletme güncellendi")
+    if args.cache_db:
+        from cache import PlaceCache
+        print(f"{args.cache_db}: {PlaceCache(args.cache_db).rewrite(transform)} kayıt güncellendi")
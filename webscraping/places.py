@@ -0,0 +1,344 @@
+"""
+Google Maps Scraper - Ana İşletme İndeksi
+Tüm aramalardan gelen kayıtları işletme kimliğine göre birleştiren kalıcı
+SQLite indeksi. Telefon ve website ikincil anahtar olarak kullanılır,
+her işletmenin hangi aramalarda göründüğü saklanır.
+
+Eski sonuç dosyalarını içe aktarmak için:
+    python places.py sonuclar_*.json berberler.json
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+
+from phones import analyze_phone_number
+from db import connect, init_database, rewrite_json_rows
+
+
+# Maps linkindeki işletme kimlikleri (feature id ve place id)
+FEATURE_ID_RE = re.compile(r'!1s(0x[0-9a-fA-F]+:0x[0-9a-fA-F]+)')
+PLACE_ID_RE = re.compile(r'!19s(ChIJ[\w-]+)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    id INTEGER PRIMARY KEY,
+    place_id TEXT UNIQUE,
+    name_key TEXT NOT NULL DEFAULT '',
+    phone_key TEXT NOT NULL DEFAULT '',
+    website_key TEXT NOT NULL DEFAULT '',
+    rating REAL,
+    data TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_places_phone ON places (phone_key);
+CREATE INDEX IF NOT EXISTS idx_places_website ON places (website_key);
+CREATE INDEX IF NOT EXISTS idx_places_seen ON places (last_seen);
+
+-- İşletmenin göründüğü aramalar
+CREATE TABLE IF NOT EXISTS place_queries (
+    place INTEGER NOT NULL,
+    location TEXT NOT NULL,
+    profession TEXT NOT NULL,
+    job_id TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (place, location, profession)
+);
+CREATE INDEX IF NOT EXISTS idx_place_queries_query ON place_queries (location, profession);
+"""
+
+# İndekste saklanmayan, aramaya özel alanlar
+TRANSIENT_FIELDS = ('sira',)
+
+# Sonuç dosyası adlarından sorgu çıkarmak için: sonuclar_<lokasyon>_<meslek>.json
+# veya iş kimliğiyle yazılan sonuclar_<lokasyon>_<meslek>_<iş kimliği>.jsonl
+RESULT_FILE_RE = re.compile(r'^sonuclar_(.+?)_(.+?)(?:_[0-9a-f]{12})?\.jsonl?$')
+
+
+def normalize_text(value):
+    """Karşılaştırma için boşlukları sadeleştirip küçük harfe çevirir."""
+    return ' '.join(str(value or '').split()).casefold()
+
+
+def name_key(record):
+    """Kaydın karşılaştırmada kullanılan sade ismi."""
+    return normalize_text(record.get('isim'))
+
+
+def phone_key(record):
+    """
+    Telefonun ülke kodu ve baştaki 0 atılmış rakamları.
+    '0216 123 45 67' ve '+90 216 123 45 67' aynı anahtarı verir.
+    """
+    info = record.get('telefon_bilgi') or analyze_phone_number(record.get('telefon'))
+    digits = info.get('formatted') or ''
+    if digits.startswith('90') and len(digits) == 12:
+        digits = digits[2:]
+    return digits.lstrip('0')
+
+
+def website_key(record):
+    """Şema, www. ve sondaki / atılmış küçük harfli adres."""
+    url = (record.get('website') or '').strip().lower()
+    url = re.sub(r'^[a-z]+://', '', url).split('?')[0].split('#')[0]
+    if url.startswith('www.'):
+        url = url[4:]
+    return url.rstrip('/')
+
+
+def parse_rating(value):
+    """'4,6' gibi puanı sayıya çevirir; yoksa None."""
+    try:
+        return float(str(value).replace(',', '.'))
+    except (TypeError, ValueError):
+        return None
+
+
+def record_rating(record):
+    """Kaydın puanı sayı olarak (sıralama ve filtre için)."""
+    return parse_rating(record.get('puan'))
+
+
+def merge_fields(old, new):
+    """Yeni kaydın boş olmayan alanları eskisinin üzerine yazılır."""
+    merged = dict(old)
+    for key, value in new.items():
+        if key in TRANSIENT_FIELDS:
+            continue
+        if value not in (None, '', [], {}):
+            merged[key] = value
+    return merged
+
+
+def parse_place_id(link):
+    """
+    Maps linkinden işletmenin kalıcı kimliğini çıkarır.
+    Kimlik bulunamazsa sorgu parametreleri atılmış link döner.
+    """
+    if not link:
+        return ''
+    match = FEATURE_ID_RE.search(link) or PLACE_ID_RE.search(link)
+    if match:
+        return match.group(1)
+    return link.split('?')[0]
+
+
+class PlaceIndex:
+    """
+    Aramalardan bağımsız ana işletme veri seti.
+
+    - Birincil anahtar Maps place ID'sidir.
+    - place ID eşleşmezse aynı isimli ve aynı telefon veya websiteli kayıt
+      aynı işletme sayılır (zincir şubeleri isimle ayrışmazsa birleşebilir).
+    - Birleştirmede en yeni kaydın dolu alanları geçerlidir.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        init_database(path)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return connect(self.path, rows=True)
+
+    def _find(self, conn, place_id, name, phone, website):
+        if place_id:
+            row = conn.execute(
+                "SELECT id, data, last_seen FROM places WHERE place_id = ?", (place_id,)
+            ).fetchone()
+            if row:
+                return row
+        for column, value in (('phone_key', phone), ('website_key', website)):
+            if value and name:
+                row = conn.execute(
+                    f"SELECT id, data, last_seen FROM places WHERE {column} = ? AND name_key = ?",
+                    (value, name)
+                ).fetchone()
+                if row:
+                    return row
+        return None
+
+    def add(self, record, location='', profession='', job_id=None, seen_at=None):
+        """Kaydı indekse ekler veya mevcut işletmeyle birleştirir; satır kimliğini döndürür."""
+        if not record.get('isim'):
+            return None
+        now = seen_at or time.time()
+        place_id = parse_place_id(record.get('link')) or None
+        name = name_key(record)
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._find(conn, place_id, name, phone_key(record), website_key(record))
+                if row is None:
+                    data = merge_fields({}, record)
+                elif now >= row['last_seen']:
+                    data = merge_fields(json.loads(row['data']), record)
+                else:
+                    # Daha eski bir kayıt (ör. eski dosya) sadece boş alanları doldurur
+                    data = merge_fields(merge_fields({}, record), json.loads(row['data']))
+                values = (
+                    name_key(data), phone_key(data), website_key(data),
+                    record_rating(data), json.dumps(data, ensure_ascii=False)
+                )
+                if row:
+                    conn.execute(
+                        "UPDATE places SET place_id = COALESCE(place_id, ?), name_key = ?, phone_key = ?,"
+                        " website_key = ?, rating = ?, data = ?, first_seen = MIN(first_seen, ?),"
+                        " last_seen = MAX(last_seen, ?) WHERE id = ?",
+                        (place_id, *values, now, now, row['id'])
+                    )
+                    place = row['id']
+                else:
+                    place = conn.execute(
+                        "INSERT INTO places (place_id, name_key, phone_key, website_key, rating, data,"
+                        " first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (place_id, *values, now, now)
+                    ).lastrowid
+
+                if location or profession:
+                    conn.execute(
+                        "INSERT INTO place_queries (place, location, profession, job_id, first_seen, last_seen)"
+                        " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (place, location, profession)"
+                        " DO UPDATE SET job_id = COALESCE(excluded.job_id, job_id),"
+                        " first_seen = MIN(first_seen, excluded.first_seen),"
+                        " last_seen = MAX(last_seen, excluded.last_seen)",
+                        (place, normalize_text(location), normalize_text(profession), job_id, now, now)
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return place
+
+    def _where(self, filters):
+        """Filtre sözlüğünden WHERE koşulu ve parametreleri üretir."""
+        clauses, params = [], []
+        if filters.get('location') or filters.get('profession'):
+            sub, sub_params = [], []
+            for key in ('location', 'profession'):
+                if filters.get(key):
+                    sub.append(f"q.{key} = ?")
+                    sub_params.append(normalize_text(filters[key]))
+            clauses.append(
+                "EXISTS (SELECT 1 FROM place_queries q WHERE q.place = p.id AND "
+                + " AND ".join(sub) + ")"
+            )
+            params.extend(sub_params)
+        if filters.get('q'):
+            clauses.append("p.name_key LIKE ?")
+            params.append(f"%{normalize_text(filters['q'])}%")
+        if filters.get('phone'):
+            clauses.append("p.phone_key = ?")
+            params.append(phone_key({'telefon': filters['phone']}))
+        if filters.get('website'):
+            clauses.append("p.website_key = ?")
+            params.append(website_key({'website': filters['website']}))
+        if filters.get('has_phone'):
+            clauses.append("p.phone_key != ''")
+        if filters.get('has_website'):
+            clauses.append("p.website_key != ''")
+        if filters.get('min_rating') is not None:
+            clauses.append("p.rating >= ?")
+            params.append(filters['min_rating'])
+        if filters.get('since') is not None:
+            clauses.append("p.last_seen >= ?")
+            params.append(filters['since'])
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, **filters):
+        """Filtreye uyan işletme sayısı."""
+        where, params = self._where(filters)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM places p{where}", params).fetchone()[0]
+
+    def iter_places(self, offset=0, limit=None, **filters):
+        """
+        Filtreye uyan işletmeleri ilk görülme sırasıyla okuyan generator.
+        Her kayda 'sira' ve göründüğü aramalar ('sorgular') eklenir.
+        Filtreler: location, profession, q (isim), phone, website,
+        has_phone, has_website, min_rating, since (zaman damgası)
+        """
+        where, params = self._where(filters)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT p.id, p.data, p.first_seen, p.last_seen,"
+                " (SELECT group_concat(q.location || ' / ' || q.profession, char(31))"
+                "  FROM place_queries q WHERE q.place = p.id) AS queries"
+                f" FROM places p{where} ORDER BY p.first_seen, p.id LIMIT ? OFFSET ?",
+                (*params, -1 if limit is None else limit, offset)
+            )
+            for i, row in enumerate(cursor, offset + 1):
+                data = json.loads(row['data'])
+                data.update({
+                    'sira': i,
+                    'sorgular': row['queries'].split('\x1f') if row['queries'] else [],
+                    'ilk_gorulme': row['first_seen'],
+                    'son_gorulme': row['last_seen']
+                })
+                yield data
+
+    def rewrite_places(self, transform, batch_size=1000):
+        """
+        İndeksteki kayıtları batch_size'lık gruplar halinde transform(kayıtlar)
+        fonksiyonundan geçirip yeniden yazar; isim, telefon ve website
+        anahtarları ile puan sütunu da güncellenir. Değişen işletme sayısını döndürür.
+        """
+        with self._connect() as conn:
+            return rewrite_json_rows(
+                conn, 'places', 'id', 'data', transform, batch_size,
+                derived={
+                    'name_key': name_key, 'phone_key': phone_key,
+                    'website_key': website_key, 'rating': record_rating
+                }
+            )
+
+    def import_file(self, path):
+        """
+        Eski sonuç dosyasını (liste, {'sonuclar': [...]} veya JSON Lines)
+        indekse aktarır. Sorgu dosya içeriğinden veya adından alınır.
+        """
+        with open(path, encoding='utf-8-sig') as f:
+            if path.endswith('.jsonl'):
+                data = [json.loads(line) for line in f if line.strip()]
+            else:
+                data = json.load(f)
+
+        location = profession = ''
+        if isinstance(data, dict):
+            location, profession = data.get('lokasyon', ''), data.get('meslek', '')
+            data = data.get('sonuclar', [])
+        else:
+            match = RESULT_FILE_RE.match(os.path.basename(path))
+            if match:
+                location, profession = (part.replace('_', ' ') for part in match.groups())
+
+        seen_at = os.path.getmtime(path)
+        return sum(1 for record in data if self.add(record, location, profession, seen_at=seen_at))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Eski sonuç dosyalarını ana işletme indeksine aktarır.")
+    parser.add_argument('files', nargs='+', help="sonuclar_*.json, *.jsonl veya son_arama.json dosyaları")
+    parser.add_argument(
+        '--db', default=os.getenv('PLACE_INDEX_DB', os.path.join(
+            os.getenv('DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')),
+            'places.db'
+        )),
+        help="İndeks veritabanı"
+    )
+    args = parser.parse_args()
+
+    index = PlaceIndex(args.db)
+    for path in args.files:
+        try:
+            print(f"{path}: {index.import_file(path)} kayıt aktarıldı")
+        except Exception as e:
+            print(f"{path} aktarılamadı: {e}")
+    print(f"İndekste toplam {index.count()} işletme var.")
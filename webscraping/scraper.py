@@ -0,0 +1,922 @@
+"""
+Google Maps Scraper - Tarama Motoru
+Kuyruktan alınan işleri Selenium sürücüleri (ve HTTP/CDP motorları) ile
+çalıştırır. Web uygulaması bu modülü ilk iş çalıştığında yükler; böylece
+Selenium ve motor kütüphaneleri worker açılışında yüklenmez.
+"""
+
+import os
+import json
+import time
+import queue
+import weakref
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Selenium Importları
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from browser import (
+    LIGHTWEIGHT_BROWSER, LIGHTWEIGHT_WINDOW, apply_lightweight_profile, block_heavy_requests
+)
+from driver_pool import DriverPool
+from pacing import AIMDPacer, LinkQueue
+from jobs import DONE, CANCELLED, FAILED
+from metrics import (
+    BLOCKED_PAGES, DRIVER_STARTUP, JOB_DURATION, JOBS, NAVIGATION, PERSIST, WAIT,
+    bind, bind_timings, count_page, observe, timed
+)
+from stores import BASE_DIR, cache_mode, job_store, place_cache, place_index, query_cache
+from waits import AdaptiveTimeout, wait_for_feed_growth
+from cdp_engine import WEBSOCKETS_AVAILABLE, fetch_place_details as cdp_fetch_details
+from http_engine import HTTPX_AVAILABLE, fetch_place_details as http_fetch_details
+from tiling import grid_tiles, parse_viewport, tile_url, viewport_bounds
+from extractors import (
+    detect_block, extract_detailed_data, extract_feed_cards, feed_card_result,
+    fill_missing_fields, harvest_feed_links, needs_detail_page
+)
+from places import parse_place_id
+
+
+# Detay sayfalarını paralel çeken sürücü (işçi) sayısı
+SCRAPE_WORKERS = max(1, int(os.getenv('SCRAPE_WORKERS', 4)))
+
+# Her işçi sürücüsünde açılacak sekme sayısı. 1'den büyükse sekmeler
+# boru hattı gibi çalışır: bir sekmeden veri okunurken diğerleri sonraki
+# linkleri yükler. Aynı anda yüklenen sayfa sayısı SCRAPE_WORKERS x TABS_PER_DRIVER olur.
+TABS_PER_DRIVER = max(1, int(os.getenv('TABS_PER_DRIVER', 1)))
+
+# Sürücü başına sayfa açma hızı sınırları (sayfa/saniye). Hız sağlıklı
+# sayfalarda artar, boş/engellenmiş sayfalarda yarıya iner (AIMD).
+PACING_MAX_RATE = max(0.01, float(os.getenv('PACING_MAX_RATE', 4)))
+PACING_MIN_RATE = max(0.01, float(os.getenv('PACING_MIN_RATE', 0.2)))
+
+# Çekilemeyen işletme sayfasının farklı sürücülerde en fazla kaç kez deneneceği
+DETAIL_MAX_ATTEMPTS = max(1, int(os.getenv('DETAIL_MAX_ATTEMPTS', 2)))
+
+# Varsayılan detay sayfası motoru: selenium, http veya cdp (web_app.DETAIL_ENGINES)
+DETAIL_ENGINE = os.getenv('DETAIL_ENGINE', 'selenium')
+
+# HTTP motorunda aynı anda yapılacak istek sayısı
+HTTP_CONCURRENCY = max(1, int(os.getenv('HTTP_CONCURRENCY', 8)))
+
+# CDP motorunda tarayıcı başına açılacak sekme sayısı
+CDP_TABS = max(1, int(os.getenv('CDP_TABS', 8)))
+
+# Bir arama listesinin en fazla kaç kez kaydırılacağı
+MAX_SCROLL_ATTEMPTS = 30
+
+# Tarayıcı penceresi; ızgara hücrelerinin zoom hesabı da buna göre yapılır
+WINDOW_WIDTH, WINDOW_HEIGHT = LIGHTWEIGHT_WINDOW if LIGHTWEIGHT_BROWSER else (1920, 1080)
+
+
+# --- YARDIMCI FONKSİYONLAR ---
+
+def get_chrome_driver():
+    """
+    Chrome WebDriver oluşturur.
+    Sunucu (Linux) ve yerel (Windows) ortamlar için uyumludur.
+    """
+    started = time.time()
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument(f"--window-size={WINDOW_WIDTH},{WINDOW_HEIGHT}")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--lang=tr-TR")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    
+    # Hafif profil: görsel, font, medya ve harita karoları indirilmez
+    if LIGHTWEIGHT_BROWSER:
+        apply_lightweight_profile(chrome_options)
+    
+    # Linux sunucu için ChromeDriver yolu
+    linux_chromedriver_path = '/usr/bin/chromedriver'
+    
+    if os.path.exists(linux_chromedriver_path):
+        # Linux sunucu
+        service = Service(linux_chromedriver_path)
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+    else:
+        # Windows veya webdriver-manager kullan
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            service = Service(ChromeDriverManager().install())
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+        except Exception:
+            # Sistem PATH'inden Chrome kullan
+            driver = webdriver.Chrome(options=chrome_options)
+    
+    if LIGHTWEIGHT_BROWSER:
+        block_heavy_requests(driver)
+    
+    observe(DRIVER_STARTUP, time.time() - started, 'startup')
+    return driver
+
+
+# Aramalar arasında yeniden kullanılan sürücü havuzu
+driver_pool = DriverPool(
+    get_chrome_driver,
+    max_size=int(os.getenv('DRIVER_POOL_SIZE', SCRAPE_WORKERS)),
+    max_age=int(os.getenv('DRIVER_MAX_AGE', 1800)),
+    max_jobs=int(os.getenv('DRIVER_MAX_JOBS', 50))
+)
+
+
+# Havuz doluyken işin canlı tutulma aralığı (saniye). İş deposunun
+# stale_after süresinden kısa olmalı; yoksa bekleyen iş yanıt vermiyor
+# sanılıp başka süreçte ikinci kez çalıştırılır.
+DRIVER_WAIT_HEARTBEAT = 30
+
+
+def acquire_driver(job):
+    """
+    İşin ana sürücüsünü havuzdan kiralar. Sürücüler başka işlerdeyken
+    iş DRIVER_WAIT_HEARTBEAT saniyede bir güncellenir. İş beklerken iptal
+    edilirse None döner.
+    """
+    while True:
+        driver = driver_pool.acquire(timeout=DRIVER_WAIT_HEARTBEAT)
+        if driver is not None:
+            return driver
+        if job.is_cancelled():
+            return None
+        job.update(message='Boşta tarayıcı bekleniyor...')
+
+
+def lease_drivers(count):
+    """
+    Havuzdan en fazla verilen sayıda ek sürücü kiralar.
+    Havuz doluysa veya tarayıcı başlatılamazsa eksik sürücü atlanır.
+    """
+    if count <= 0:
+        return []
+
+    drivers = []
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(bind(driver_pool.acquire), False) for _ in range(count)]
+        for future in futures:
+            try:
+                driver = future.result()
+            except Exception as e:
+                print(f"Ek tarayıcı başlatılamadı: {e}")
+                continue
+            if driver:
+                drivers.append(driver)
+    return drivers
+
+
+# Sekmede sonraki sayfaya beklemeden geçer; eski belge işaretlenir ki
+# yeni sayfa yüklenmeden okunmasın
+NAVIGATE_JS = "window.__eskiSayfa = true; window.location.href = arguments[0];"
+# Geçiş bittiyse sayfanın kendi yüklenme süresini (ms, Navigation Timing)
+# döndürür. 'interactive' durumunda DOMContentLoaded henüz bitmemiş olabilir;
+# süre yazılana kadar null döner. Tarayıcı süreyi vermiyorsa -1 döner.
+NAVIGATED_JS = """
+if (window.__eskiSayfa || document.readyState === 'loading') return null;
+const nav = performance.getEntriesByType('navigation')[0];
+if (!nav) return -1;
+return nav.domContentLoadedEventEnd > 0 ? nav.domContentLoadedEventEnd : null;
+"""
+
+
+def scrape_detail(driver, index, link, card):
+    """Açık işletme sayfasından kaydı okur, liste kartıyla tamamlar ve önbelleğe yazar."""
+    data = extract_detailed_data(driver, index, link)
+    if card:
+        fill_missing_fields(data, card)
+    if data['isim']:
+        place_cache.put(parse_place_id(link), data)
+    return data
+
+
+def report_detail(job, worker_status, data, add_result, lock, total):
+    """Sonuçlanan linki işçi durumuna ve iş ilerlemesine yansıtır."""
+    workers = job.status['workers']
+    with lock:
+        worker_status['done'] += 1
+        worker_status['current'] = None
+        if data and data['isim']:
+            add_result(data)
+
+        done = sum(w['done'] for w in workers)
+        job.update(
+            message=f"Veri çekiliyor: {done}/{total}",
+            progress=20 + int((done / total) * 80),
+            workers=workers
+        )
+
+
+# Sürücülerin hız denetleyicileri; sürücü havuza dönüp başka işte
+# kullanılsa da öğrendiği hız korunur
+driver_pacers = weakref.WeakKeyDictionary()
+pacers_lock = threading.Lock()
+
+
+def pacer_for(driver):
+    """Sürücünün hız denetleyicisini döndürür (yoksa en yüksek hızla oluşturur)."""
+    with pacers_lock:
+        pacer = driver_pacers.get(driver)
+        if pacer is None:
+            pacer = driver_pacers[driver] = AIMDPacer(PACING_MAX_RATE, PACING_MIN_RATE)
+        return pacer
+
+
+def pace(pacer):
+    """Sürücünün hızına göre sıradaki sayfadan önce bekler."""
+    waited = pacer.wait()
+    if waited:
+        observe(WAIT, waited, 'wait', kind='pacing')
+
+
+def settle_detail(driver, worker_id, worker_status, link_queue, item, data, latency):
+    """
+    Sayfa sonucunu hız denetleyicisine bildirir. Boş sonuçta sayfanın onay
+    veya captcha sayfası olup olmadığına bakılır ve link, denemeyen başka
+    bir işçiye verilmeye çalışılır. Link sonuçlandıysa True döner.
+    """
+    pacer = pacer_for(driver)
+    ok = bool(data and data['isim'])
+    count_page('selenium', ok)
+    pacer.record(latency, ok)
+    worker_status['rate'] = round(pacer.rate, 2)
+    if ok:
+        link_queue.done(worker_id, item)
+        return True
+
+    worker_status['errors'] += 1
+    try:
+        reason = detect_block(driver)
+        if reason:
+            print(f"İşçi {worker_id + 1}: {reason} sayfası (Index {item[0]})")
+            BLOCKED_PAGES.inc(reason=reason)
+            worker_status['blocked'] += 1
+            if reason == 'consent':
+                accept_consent(driver)
+    except Exception as e:
+        print(f"İşçi {worker_id + 1} sayfa denetlenemedi (Index {item[0]}): {e}")
+    return not link_queue.retry(worker_id, item)
+
+
+def leave_detail_queue(job, worker_id, worker_status, link_queue, add_result, lock, total):
+    """
+    İşçiyi kuyruktan çıkarır. Artık hiçbir işçinin alamayacağı linkler
+    çekilemedi olarak sonuçlandırılır ki ilerleme toplama ulaşsın.
+    """
+    dropped = link_queue.leave(worker_id)
+    if job.is_cancelled():
+        return
+    for item in dropped:
+        print(f"İşçi {worker_id + 1}: link çekilemedi (Index {item[0]})")
+        report_detail(job, worker_status, None, add_result, lock, total)
+
+
+def detail_worker(job, worker_id, driver, link_queue, add_result, lock, total):
+    """
+    Kuyruktaki linkleri sırayla alıp detaylarını çeken işçi.
+    Her işçi kendi sürücüsünü kullanır; sonuçlar çekildiği anda kaydedilir.
+    Sayfa açma hızı sürücünün hız denetleyicisine göre ayarlanır.
+    TABS_PER_DRIVER > 1 ise sayfalar sürücünün sekmelerinde boru hattıyla çekilir.
+    """
+    if TABS_PER_DRIVER > 1:
+        return tabbed_detail_worker(job, worker_id, driver, link_queue, add_result, lock, total)
+
+    worker_status = job.status['workers'][worker_id]
+    pacer = pacer_for(driver)
+
+    try:
+        while not job.is_cancelled():
+            item = link_queue.get(worker_id)
+            if item is None:
+                break
+            index, link, card = item
+
+            worker_status['current'] = index
+            pace(pacer)
+            started = time.time()
+            try:
+                with timed(NAVIGATION, 'navigate', kind='detail'):
+                    driver.get(link)
+                data = scrape_detail(driver, index, link, card)
+            except Exception as e:
+                print(f"İşçi {worker_id + 1} hata (Index {index}): {e}")
+                data = None
+
+            if settle_detail(driver, worker_id, worker_status, link_queue, item, data, time.time() - started):
+                report_detail(job, worker_status, data, add_result, lock, total)
+            else:
+                worker_status['current'] = None
+    finally:
+        leave_detail_queue(job, worker_id, worker_status, link_queue, add_result, lock, total)
+
+
+def open_tabs(driver, count):
+    """Sürücüde toplam count sekme olacak şekilde yeni sekmeler açar; sekme kimliklerini döndürür."""
+    handles = [driver.current_window_handle]
+    for _ in range(count - 1):
+        try:
+            driver.switch_to.new_window('tab')
+        except Exception as e:
+            print(f"Yeni sekme açılamadı: {e}")
+            break
+        # Ağ engelleme sekmeye özeldir, yeni sekmede tekrar kurulur
+        if LIGHTWEIGHT_BROWSER:
+            block_heavy_requests(driver)
+        handles.append(driver.current_window_handle)
+    driver.switch_to.window(handles[0])
+    return handles
+
+
+def close_tabs(driver, handles):
+    """open_tabs ile açılan sekmeleri kapatıp ilk sekmeye döner."""
+    for handle in handles[1:]:
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except Exception:
+            pass
+    try:
+        driver.switch_to.window(handles[0])
+    except Exception:
+        pass
+
+
+def wait_for_navigation(driver, timeout=15):
+    """
+    NAVIGATE_JS ile başlatılan sayfa geçişi tamamlanana kadar bekler.
+    Dönen değer: (geçiş oldu mu, sayfanın yüklenme süresi saniye veya None)
+    """
+    try:
+        loaded = WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(NAVIGATED_JS)
+        )
+    except Exception:
+        return False, None
+    return True, (loaded / 1000 if loaded > 0 else None)
+
+
+def tabbed_detail_worker(job, worker_id, driver, link_queue, add_result, lock, total):
+    """
+    Linkleri sürücünün TABS_PER_DRIVER sekmesinde boru hattıyla çeker.
+    Her sekmeye bir link yüklenmeye başlatılır; sekmeler sırayla okunur ve
+    okunan sekmeye hemen sonraki link verilir. Böylece bir sayfa okunurken
+    diğer sekmeler yüklenmeye devam eder.
+    """
+    worker_status = job.status['workers'][worker_id]
+    pacer = pacer_for(driver)
+    handles = open_tabs(driver, TABS_PER_DRIVER)
+    loading = {}
+
+    def start(handle, item):
+        """Sekmeye linki yükletir (beklemeden)."""
+        pace(pacer)
+        try:
+            driver.switch_to.window(handle)
+            driver.execute_script(NAVIGATE_JS, item[1])
+            loading[handle] = (item, True)
+        except Exception:
+            # Okuma sırasında driver.get ile açılır
+            loading[handle] = (item, False)
+
+    try:
+        while not job.is_cancelled():
+            # Boş sekmelere sıradaki linkler verilir; hiçbiri yüklenmiyorsa
+            # başka işçilerden yeniden denenecek link gelmesi beklenir
+            for handle in handles:
+                if handle not in loading:
+                    item = link_queue.get(worker_id, block=False)
+                    if item is None:
+                        break
+                    start(handle, item)
+            if not loading:
+                item = link_queue.get(worker_id)
+                if item is None:
+                    break
+                start(handles[0], item)
+
+            for handle in list(loading):
+                item, started = loading.pop(handle)
+                index, link, card = item
+                worker_status['current'] = index
+                # Gecikme = sayfanın kendi yüklenme süresi + okuma süresi.
+                # Sekmenin açılışından ölçülse diğer sekmeleri okurken geçen
+                # süre de sayılır ve gecikme sekme sayısıyla büyürdü. Süre
+                # bilinmiyorsa gecikme ölçülmez (None).
+                load_time = loaded_at = None
+                try:
+                    driver.switch_to.window(handle)
+                    navigated = False
+                    if started:
+                        with timed(WAIT, 'wait', kind='tab'):
+                            navigated, load_time = wait_for_navigation(driver)
+                    if navigated:
+                        if load_time is not None:
+                            observe(NAVIGATION, load_time, kind='tab')
+                    else:
+                        get_started = time.time()
+                        with timed(NAVIGATION, 'navigate', kind='tab'):
+                            driver.get(link)
+                        load_time = time.time() - get_started
+                    loaded_at = time.time()
+                    data = scrape_detail(driver, index, link, card)
+                except Exception as e:
+                    print(f"İşçi {worker_id + 1} hata (Index {index}): {e}")
+                    data = None
+
+                latency = None
+                if load_time is not None and loaded_at is not None:
+                    latency = load_time + (time.time() - loaded_at)
+                if settle_detail(driver, worker_id, worker_status, link_queue, item, data, latency):
+                    report_detail(job, worker_status, data, add_result, lock, total)
+                else:
+                    worker_status['current'] = None
+                if job.is_cancelled():
+                    break
+                next_item = link_queue.get(worker_id, block=False)
+                if next_item is not None:
+                    start(handle, next_item)
+    finally:
+        # Sekmelerde kalan linkler kuyruktan çıkışta diğer işçilere verilir
+        leave_detail_queue(job, worker_id, worker_status, link_queue, add_result, lock, total)
+        close_tabs(driver, handles)
+
+
+def accept_consent(driver):
+    """Çerez onayı çıkarsa kabul eder."""
+    try:
+        WebDriverWait(driver, 3).until(
+            EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Kabul')]"))
+        ).click()
+    except Exception:
+        pass
+
+
+def open_feed(driver, url):
+    """Arama sayfasını açar ve sonuç listesini (feed) döndürür; liste yoksa None."""
+    with timed(NAVIGATION, 'navigate', kind='search'):
+        driver.get(url)
+    accept_consent(driver)
+    try:
+        with timed(WAIT, 'wait', kind='feed'):
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']"))
+            )
+    except Exception:
+        return None
+    return driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
+
+
+def scroll_feed(job, driver, feed, add_links, scroll_top=0, on_batch=None):
+    """
+    Feed'i liste sonuna kadar veya yeterli link toplanana kadar kaydırır.
+    Her turda sadece yeni eklenen kartların linkleri add_links'e verilir;
+    add_links toplama tamamlandıysa True döndürür. on_batch(scroll_top)
+    her turdan sonra çağrılır. Liste sonuna ulaşıldıysa True döner.
+    """
+    harvested = 0
+    feed_end = False
+    scroll_timeout = AdaptiveTimeout(initial=4, minimum=1, maximum=10)
+
+    for _ in range(MAX_SCROLL_ATTEMPTS):
+        batch = harvest_feed_links(driver, feed, harvested)
+        harvested = batch['total']
+        feed_end = batch['end']
+        enough = add_links(batch['links'])
+        if on_batch:
+            on_batch(scroll_top)
+        if feed_end or enough or job.is_cancelled():
+            break
+
+        scroll_top = driver.execute_script(
+            "arguments[0].scrollTop = arguments[0].scrollHeight; return arguments[0].scrollTop",
+            feed
+        ) or scroll_top
+        growth = wait_for_feed_growth(driver, feed, harvested, scroll_timeout.current)
+        observe(WAIT, growth['elapsed'], 'wait', kind='scroll')
+        scroll_timeout.record(growth['elapsed'], growth['timed_out'])
+
+    return feed_end
+
+
+def locate_area(driver, location):
+    """Lokasyonu Maps'te arar ve açılan haritanın kapsadığı alanı döndürür."""
+    with timed(NAVIGATION, 'navigate', kind='search'):
+        driver.get(f"https://www.google.com/maps/search/{location.replace(' ', '+')}")
+    accept_consent(driver)
+    viewport = WebDriverWait(driver, 15).until(lambda d: parse_viewport(d.current_url))
+    return viewport_bounds(*viewport, WINDOW_WIDTH, WINDOW_HEIGHT)
+
+
+def tile_worker(job, driver, tile_queue, add_links, on_tile_done):
+    """Kuyruktaki ızgara hücrelerini sırayla arayıp linklerini toplayan işçi."""
+    want_cards = job.options.get('mode') in ('list', 'hybrid')
+    while not job.is_cancelled():
+        try:
+            index, tile = tile_queue.get_nowait()
+        except queue.Empty:
+            break
+        # Yeterli link toplandıysa kalan hücreler aranmaz
+        if add_links([]):
+            break
+
+        cards = []
+        try:
+            feed = open_feed(driver, tile_url(job.profession, tile))
+            if feed is not None:
+                scroll_feed(job, driver, feed, add_links)
+                if want_cards:
+                    cards = extract_feed_cards(driver, feed)
+        except Exception as e:
+            print(f"Hücre {index + 1} hata: {e}")
+            continue
+        on_tile_done(index, cards)
+
+
+def harvest_grid(job, drivers, place_links, add_links, cards, lock):
+    """
+    Lokasyonu grid x grid hücreye bölüp her hücrede ayrı görünüm araması yapar.
+    Hücreler sürücüler arasında paylaştırılır; linkler add_links ile
+    işletme kimliğine göre tekilleştirilir, kart bilgileri cards'a eklenir.
+    """
+    checkpoint = job.checkpoint
+    grid = job.options['grid']
+    bounds = checkpoint.get('bounds') or job.options.get('bbox')
+    if not bounds:
+        job.update(message='Bölge haritada aranıyor...')
+        bounds = locate_area(drivers[0], job.location)
+
+    tiles = grid_tiles(bounds, grid, WINDOW_WIDTH, WINDOW_HEIGHT)
+    tiles_done = set(checkpoint.get('tiles_done', []))
+    job.save_checkpoint(bounds=list(bounds))
+
+    tile_queue = queue.Queue()
+    for index, tile in enumerate(tiles):
+        if index not in tiles_done:
+            tile_queue.put((index, tile))
+
+    def on_tile_done(index, tile_cards):
+        with lock:
+            tiles_done.add(index)
+            for card in tile_cards:
+                cards.setdefault(parse_place_id(card['link']), card)
+            job.update(
+                message=f"Hücre {len(tiles_done)}/{len(tiles)} tarandı, "
+                        f"{len(place_links)} işletme bulundu...",
+                progress=5 + int(len(tiles_done) / len(tiles) * 15)
+            )
+            job.save_checkpoint(links=place_links, tiles_done=sorted(tiles_done), cards=cards)
+
+    workers = drivers[:tile_queue.qsize()] or drivers[:1]
+    with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+        futures = [
+            executor.submit(bind(tile_worker), job, d, tile_queue, add_links, on_tile_done)
+            for d in workers
+        ]
+        for future in futures:
+            future.result()
+
+
+def scrape_task(job):
+    """
+    Kuyruktan alınan bir işi çalıştıran ana scraping fonksiyonu.
+    İlerleme job.checkpoint'e yazılır; iş yeniden başlarsa toplanmış linkler,
+    kaydırma konumu ve kaydedilmiş sonuçlar tekrar işlenmez.
+    """
+    location, profession, max_results = job.location, job.profession, job.max_results
+    scrape_mode = job.options.get('mode', 'detail')
+    grid = job.options.get('grid')
+    checkpoint = job.checkpoint
+    done_links = job_store.result_links(job.id) if job.status['total_found'] else set()
+    
+    # Bu thread'deki ve işçilere verilen ölçümler işin süre dökümüne yazılır
+    bind_timings(job.timings)
+    started = time.time()
+    driver = None
+    extra_drivers = []
+    warmup = None
+    try:
+        driver = acquire_driver(job)
+        if driver is None:
+            job.store.finish(job.id, CANCELLED, 'İptal edildi.')
+            return
+
+        # Ek sürücüler link toplama sırasında arka planda hazırlansın. HTTP/CDP
+        # motoru kullanılıyorsa detay işçileri ancak motorun çekemediği linkler
+        # için gerekir; o zaman run_detail_phase kiralar.
+        if grid:
+            worker_count = min(SCRAPE_WORKERS, grid * grid)
+        elif scrape_mode == 'list' or detail_engine(job) != 'selenium':
+            worker_count = 1
+        else:
+            worker_count = min(SCRAPE_WORKERS, max_results)
+        warmup_executor = ThreadPoolExecutor(max_workers=1)
+        warmup = warmup_executor.submit(bind(lease_drivers), worker_count - 1)
+        warmup_executor.shutdown(wait=False)
+
+        # Her sonuç geldiği anda iş deposuna ve JSON Lines dosyasına yazılır
+        results_file = start_results_file(job.id, location, profession, append=bool(done_links))
+
+        def add_result(record):
+            with timed(PERSIST, 'persist'):
+                job.add_result(record)
+                append_results_file(results_file, record)
+                try:
+                    place_index.add(record, location, profession, job.id)
+                except Exception as e:
+                    print(f"İndekse eklenemedi: {e}")
+
+        if checkpoint.get('pending') is not None:
+            # Link toplama önceki denemede bitti; sadece eksik detaylar çekilir
+            exhausted = checkpoint.get('exhausted', False)
+            detail_links = [
+                tuple(item) for item in checkpoint['pending'] if item[1] not in done_links
+            ]
+            job.update(message=f"Kaldığı yerden devam ediliyor: {len(done_links)} sonuç hazır")
+            run_detail_phase(job, driver, warmup, detail_links, add_result)
+            extra_drivers = warmup.result()
+            finish_scrape(job, exhausted, results_file)
+            return
+
+        place_links = list(checkpoint.get('links', []))
+        seen_ids = {parse_place_id(href) for href in place_links}
+        cards = dict(checkpoint.get('cards', {}))
+        lock = threading.Lock()
+
+        def add_links(links):
+            """Yeni linkleri işletme kimliğine göre tekilleştirerek ekler."""
+            with lock:
+                for href in links:
+                    place_id = parse_place_id(href)
+                    if place_id not in seen_ids:
+                        seen_ids.add(place_id)
+                        place_links.append(href)
+                return len(place_links) >= max_results
+
+        if grid:
+            # Izgara modu: her hücre ayrı bir görünüm araması olarak taranır
+            extra_drivers = warmup.result()
+            harvest_grid(job, [driver] + extra_drivers, place_links, add_links, cards, lock)
+            exhausted = False
+        else:
+            job.update(message='Google Maps açılıyor...', progress=10)
+
+            search_query = f"{location} {profession}"
+            url = f"https://www.google.com/maps/search/{search_query.replace(' ', '+')}"
+
+            scrollable_div = open_feed(driver, url)
+            if scrollable_div is None:
+                job.store.finish(job.id, DONE, 'Sonuç bulunamadı.')
+                return
+
+            job.update(message='Liste yükleniyor...')
+
+            # Önceki denemenin kaydırma konumuna atla; yeni kartlar yüklenene kadar bekle
+            if checkpoint.get('scroll_top'):
+                driver.execute_script(
+                    "arguments[0].scrollTop = arguments[1]", scrollable_div, checkpoint['scroll_top']
+                )
+                wait_for_feed_growth(driver, scrollable_div, 0, 10)
+
+            def on_batch(scroll_top):
+                job.update(message=f"{len(place_links)} işletme bulundu...")
+                job.save_checkpoint(links=place_links, scroll_top=scroll_top)
+
+            feed_end = scroll_feed(
+                job, driver, scrollable_div, add_links,
+                checkpoint.get('scroll_top', 0), on_batch
+            )
+
+            # Liste sonuna istenen sayıdan önce ulaşıldıysa daha büyük aramalar da aynı sonucu alır
+            exhausted = feed_end and len(place_links) <= max_results
+
+            # Liste kartlarından okunabilen kayıtlar (list/hybrid modları)
+            if scrape_mode in ('list', 'hybrid'):
+                for card in extract_feed_cards(driver, scrollable_div):
+                    cards[parse_place_id(card['link'])] = card
+
+        if job.is_cancelled():
+            job.store.finish(job.id, CANCELLED, 'İptal edildi.')
+            return
+
+        place_links = place_links[:max_results]
+        if not place_links:
+            job.store.finish(job.id, DONE, 'Sonuç bulunamadı.')
+            return
+
+        # Önbellekte taze kaydı olan işletmelerin sayfası tekrar açılmaz
+        use_cache = not job.options.get('refresh')
+        cached_count = 0
+        detail_links = []
+
+        for i, link in enumerate(place_links, 1):
+            if link in done_links:
+                continue
+            place_id = parse_place_id(link)
+            card = cards.get(place_id)
+            card_result = feed_card_result(card, i) if card else None
+            if card_result and (scrape_mode == 'list' or not needs_detail_page(card_result)):
+                add_result(card_result)
+                continue
+            if scrape_mode == 'list':
+                continue
+
+            cached = place_cache.get(place_id) if use_cache else None
+            if cached:
+                cached.update({'sira': i, 'link': link})
+                add_result(cached)
+                cached_count += 1
+            else:
+                detail_links.append((i, link, card_result))
+
+        if cached_count:
+            job.update(message=f"{cached_count} işletme önbellekten alındı")
+
+        # Link toplama bitti; yeniden başlarsa sadece kalan detaylar çekilir
+        job.save_checkpoint(links=place_links, exhausted=exhausted, pending=detail_links)
+
+        run_detail_phase(job, driver, warmup, detail_links, add_result)
+        extra_drivers = warmup.result()
+        finish_scrape(job, exhausted, results_file)
+
+    except Exception as e:
+        job.store.retry_or_fail(job.id, f"Hata oluştu: {str(e)}")
+    finally:
+        if warmup and not extra_drivers:
+            try:
+                extra_drivers = warmup.result()
+            except Exception:
+                extra_drivers = []
+        for d in [driver] + extra_drivers:
+            driver_pool.release(d)
+
+        observe(JOB_DURATION, time.time() - started)
+        final = job_store.get(job.id)
+        JOBS.inc(status=final['status'] if final else FAILED)
+        job.save_timings()
+        bind_timings(None)
+
+
+def engine_detail_phase(job, engine, driver, detail_links, add_result):
+    """
+    Detay sayfalarını HTTP veya CDP motoruyla çeker.
+    Çekilemeyen linkler Selenium işçilerine kalmak üzere geri döner.
+    """
+    label = engine.upper()
+    total = len(detail_links)
+    done = set()
+
+    def on_result(item, data):
+        index, link, card = item
+        if card:
+            fill_missing_fields(data, card)
+        place_cache.put(parse_place_id(link), data)
+        add_result(data)
+        count_page(engine, True)
+        done.add(index)
+        job.update(
+            message=f"{label} ile çekiliyor: {len(done)}/{total}",
+            progress=20 + int((len(done) / total) * 80)
+        )
+
+    job.update(message=f"{label} ile çekiliyor: 0/{total}", progress=20)
+    try:
+        if engine == 'cdp':
+            failed = cdp_fetch_details(
+                driver, detail_links, on_result, CDP_TABS, should_stop=job.is_cancelled
+            )
+        else:
+            failed = http_fetch_details(
+                detail_links, on_result, HTTP_CONCURRENCY, should_stop=job.is_cancelled
+            )
+    except Exception as e:
+        print(f"{label} motoru hatası: {e}")
+        failed = [item for item in detail_links if item[0] not in done]
+
+    if failed and not job.is_cancelled():
+        for _ in failed:
+            count_page(engine, False)
+        job.update(message=f"{len(failed)} işletme Selenium ile çekilecek")
+    return sorted(failed, key=lambda item: item[0])
+
+
+def detail_engine(job):
+    """İşin detay motoru; seçilen HTTP/CDP motorunun kütüphanesi yoksa 'selenium'."""
+    engine = job.options.get('engine', DETAIL_ENGINE)
+    available = {'http': HTTPX_AVAILABLE, 'cdp': WEBSOCKETS_AVAILABLE}
+    return engine if available.get(engine) else 'selenium'
+
+
+def run_detail_phase(job, driver, warmup, detail_links, add_result):
+    """
+    Detay sayfalarını işçiler arasında paylaştırarak çeker.
+    HTTP veya CDP motoru seçiliyse önce o denenir, kalanlar Selenium işçileriyle
+    çekilir; bu işçilerin ek sürücüleri ancak o zaman kiralanır.
+    """
+    engine = detail_engine(job)
+    if detail_links and engine != 'selenium':
+        detail_links = engine_detail_phase(job, engine, driver, detail_links, add_result)
+        if job.is_cancelled():
+            return
+
+    total = len(detail_links)
+    if not total:
+        return
+
+    extra_drivers = warmup.result()
+    late_drivers = []
+    if engine != 'selenium':
+        late_drivers = lease_drivers(min(SCRAPE_WORKERS, total) - 1 - len(extra_drivers))
+    try:
+        run_detail_workers(job, [driver] + extra_drivers + late_drivers, detail_links, add_result)
+    finally:
+        for d in late_drivers:
+            driver_pool.release(d)
+
+
+def run_detail_workers(job, drivers, detail_links, add_result):
+    """Linkleri verilen sürücülerin detay işçileri arasında paylaştırır."""
+    total = len(detail_links)
+    drivers = drivers[:total]
+    job.update(
+        workers=[
+            {'id': i + 1, 'done': 0, 'errors': 0, 'blocked': 0, 'rate': None, 'current': None}
+            for i in range(len(drivers))
+        ],
+        message=f"Veri çekiliyor: 0/{total} ({len(drivers)} işçi)",
+        progress=20
+    )
+
+    # Çekilemeyen link denemediği başka bir sürücüye verilir
+    link_queue = LinkQueue(detail_links, len(drivers), DETAIL_MAX_ATTEMPTS)
+
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+        futures = [
+            executor.submit(bind(detail_worker), job, i, d, link_queue, add_result, lock, total)
+            for i, d in enumerate(drivers)
+        ]
+        for future in futures:
+            future.result()
+
+
+def finish_scrape(job, exhausted, results_file):
+    """Sonuç özetini yazar, sorgu önbelleğini günceller ve işi kapatır."""
+    save_last_search(job, results_file)
+
+    if job.is_cancelled():
+        job.store.finish(job.id, CANCELLED, 'İptal edildi.')
+        return
+
+    query_cache.put(
+        job.location, job.profession, cache_mode(job.options), job.max_results, job.id, exhausted
+    )
+    job.update(progress=100)
+    job.store.finish(job.id, DONE, 'Tamamlandı!')
+
+
+def start_results_file(job_id, location, profession, append=False):
+    """
+    İşin JSON Lines sonuç dosyasının yolunu döndürür. Devam ettirilen
+    işlerde (append=True) dosya korunur, yoksa boşaltılır.
+    Her satır bir işletme kaydıdır ve çekildiği anda eklenir. Dosya adında
+    iş kimliği bulunur; aynı aramayı yapan eşzamanlı işler birbirinin
+    dosyasını boşaltmaz.
+    """
+    filename = f"sonuclar_{location}_{profession}_{job_id}.jsonl".replace(' ', '_').lower()
+    filepath = os.path.join(BASE_DIR, filename)
+    try:
+        open(filepath, 'a' if append else 'w', encoding='utf-8').close()
+    except Exception as e:
+        print(f"Sonuç dosyası açılamadı: {e}")
+    return filepath
+
+
+def append_results_file(filepath, record):
+    """Kaydı JSON Lines dosyasının sonuna ekler."""
+    try:
+        with open(filepath, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except Exception as e:
+        print(f"Sonuç dosyaya yazılamadı: {e}")
+
+
+def save_last_search(job, results_file):
+    """Son aramanın özetini son_arama.json dosyasına yazar (sonuçlar dosyada değil)."""
+    try:
+        general_filepath = os.path.join(BASE_DIR, 'son_arama.json')
+        with open(general_filepath, 'w', encoding='utf-8') as f:
+            json.dump({
+                'lokasyon': job.location,
+                'meslek': job.profession,
+                'sonuc_sayisi': job.status['total_found'],
+                'job_id': job.id,
+                'sonuc_dosyasi': os.path.basename(results_file)
+            }, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"Sonuçlar kaydedilirken hata: {e}")
@@ -0,0 +1,54 @@
+"""
+Google Maps Scraper - Depolar
+Web uygulaması ve tarama motorunun paylaştığı SQLite depoları.
+Ağır kütüphane yüklemez; Gunicorn --preload ile ana süreçte açılabilir.
+"""
+
+import os
+
+from cache import PlaceCache, QueryCache
+from jobs import JobStore
+from places import PlaceIndex
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(BASE_DIR, 'data'))
+
+# Yanıt vermeyen (ör. worker yeniden başladı) işin kaç saniye sonra kurtarılacağı
+JOB_STALE_AFTER = int(os.getenv('JOB_STALE_AFTER', 600))
+
+# Hata alan veya sahibi ölen işin kontrol noktasından kaç kez deneneceği
+JOB_MAX_ATTEMPTS = max(1, int(os.getenv('JOB_MAX_ATTEMPTS', 3)))
+
+# Tüm worker'ların paylaştığı iş deposu
+job_store = JobStore(
+    os.getenv('JOBS_DB', os.path.join(DATA_DIR, 'jobs.db')),
+    stale_after=JOB_STALE_AFTER,
+    max_attempts=JOB_MAX_ATTEMPTS
+)
+
+# İşletme detay önbelleği (süre saniye cinsinden, varsayılan 7 gün)
+place_cache = PlaceCache(
+    os.getenv('PLACE_CACHE_DB', os.path.join(DATA_DIR, 'cache.db')),
+    ttl=int(os.getenv('PLACE_CACHE_TTL', 7 * 24 * 3600)),
+    max_entries=int(os.getenv('PLACE_CACHE_MAX_ENTRIES', 50000))
+)
+
+# Aynı (konum, meslek, mod) aramalarının sonuç önbelleği (varsayılan 1 saat)
+query_cache = QueryCache(
+    os.getenv('PLACE_CACHE_DB', os.path.join(DATA_DIR, 'cache.db')),
+    ttl=int(os.getenv('QUERY_CACHE_TTL', 3600))
+)
+
+# Tüm aramalardan birleştirilen ana işletme indeksi
+place_index = PlaceIndex(os.getenv('PLACE_INDEX_DB', os.path.join(DATA_DIR, 'places.db')))
+
+
+def cache_mode(options):
+    """Sorgu önbelleği anahtarındaki mod; ızgara aramaları ayrı saklanır."""
+    mode = options.get('mode', 'detail')
+    if options.get('grid'):
+        mode = f"{mode}@grid{options['grid']}"
+        if options.get('bbox'):
+            mode += '@' + ','.join(f"{value:g}" for value in options['bbox'])
+    return mode
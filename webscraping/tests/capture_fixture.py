@@ -0,0 +1,67 @@
+"""
+Google Maps Scraper - HTTP Motoru Fixture Kaydı
+Gerçek işletme sayfalarını test_http_engine.py için kaydeder:
+    python tests/capture_fixture.py "https://www.google.com/maps/place/..." [...]
+
+Her link için iki dosya yazılır:
+    fixtures/place_<id>.html  HTTP motorunun indirdiği sayfa (aynı başlık ve çerezlerle)
+    fixtures/place_<id>.json  Aynı linkten Selenium'un extract_detailed_data ile okuduğu kayıt
+"""
+
+import os
+import re
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from http_engine import CONSENT_COOKIES, REQUEST_HEADERS
+from extractors import detect_block, extract_detailed_data
+from places import parse_place_id
+from scraper import accept_consent, get_chrome_driver
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def fixture_name(link):
+    """Linkten dosya adına uygun kısa bir ad üretir."""
+    return 'place_' + re.sub(r'[^0-9A-Za-z]+', '_', parse_place_id(link)).strip('_')[:60]
+
+
+def capture(client, driver, link):
+    """Linkin HTML'ini ve Selenium kaydını fixtures dizinine yazar."""
+    response = client.get(link)
+    response.raise_for_status()
+
+    driver.get(link)
+    if detect_block(driver) == 'consent':
+        accept_consent(driver)
+        driver.get(link)
+    record = extract_detailed_data(driver, 1, link)
+    if not record['isim']:
+        print(f"{link}: Selenium kayıt okuyamadı, atlandı")
+        return
+
+    base = os.path.join(FIXTURE_DIR, fixture_name(link))
+    with open(base + '.html', 'w', encoding='utf-8') as f:
+        f.write(response.text)
+    with open(base + '.json', 'w', encoding='utf-8') as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    print(f"{base}.html kaydedildi: {record['isim']}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    driver = get_chrome_driver()
+    try:
+        with httpx.Client(headers=REQUEST_HEADERS, cookies=CONSENT_COOKIES,
+                          follow_redirects=True, timeout=15) as client:
+            for url in sys.argv[1:]:
+                capture(client, driver, url)
+    finally:
+        driver.quit()
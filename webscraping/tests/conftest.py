@@ -0,0 +1,18 @@
+import os
+import sys
+import shutil
+import tempfile
+
+# Modüller webscraping/ dizininden düz import edilir
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Testler geliştiricinin data/ altındaki iş, önbellek ve indeks veritabanlarına
+# dokunmasın; stores import edilmeden önce geçici dizine yönlendirilir
+TEST_DATA_DIR = tempfile.mkdtemp(prefix='webscraping-test-')
+os.environ['DATA_DIR'] = TEST_DATA_DIR
+for name in ('JOBS_DB', 'PLACE_CACHE_DB', 'PLACE_INDEX_DB'):
+    os.environ.pop(name, None)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
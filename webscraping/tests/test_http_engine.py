@@ -0,0 +1,124 @@
+"""
+HTTP motoru testleri.
+Kaydedilmiş gerçek işletme sayfaları (fixtures/place_*.html) Selenium'un aynı
+linkten okuduğu kayıtla (place_*.json), iki motorun da doldurduğu alanlarda
+karşılaştırılır. Yeni sayfa eklemek için
+tests/capture_fixture.py kullanılır.
+"""
+
+import os
+import json
+import glob
+import threading
+
+import pytest
+
+from http_engine import parse_place_html
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SAVED_PAGES = sorted(glob.glob(os.path.join(FIXTURE_DIR, 'place_*.html')))
+
+UNPARSEABLE_PAGES = {
+    'consent': '<html><body><form action="https://consent.google.com/save">'
+               'Devam etmeden önce</form></body></html>',
+    'no_state': '<html><head><title>Google Maps</title></head><body></body></html>',
+    'broken_state': '<script>window.APP_INITIALIZATION_STATE=[[[1,2],"abc</script>',
+    'no_place': '<script>window.APP_INITIALIZATION_STATE=[null,[")]}\'\\n[null,1]"]];</script>',
+}
+
+
+# Selenium (extract_detailed_data) kategori ve çalışma saatlerini okumaz;
+# karşılaştırma iki motorun da doldurduğu alanlarla yapılır
+SHARED_FIELDS = (
+    'sira', 'isim', 'puan', 'degerlendirme_sayisi', 'adres', 'telefon', 'telefon_bilgi',
+    'website', 'link'
+)
+
+
+def load_expected(html_path):
+    with open(os.path.splitext(html_path)[0] + '.json', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.skipif(not SAVED_PAGES, reason="fixtures/ altında kayıtlı işletme sayfası yok")
+@pytest.mark.parametrize('html_path', SAVED_PAGES, ids=os.path.basename)
+def test_saved_page_matches_selenium_record(html_path):
+    expected = load_expected(html_path)
+    with open(html_path, encoding='utf-8') as f:
+        parsed = parse_place_html(f.read(), expected['sira'], expected['link'])
+    assert parsed is not None
+    assert {key: parsed[key] for key in SHARED_FIELDS} == {key: expected[key] for key in SHARED_FIELDS}
+
+
+@pytest.mark.parametrize('name', sorted(UNPARSEABLE_PAGES))
+def test_unparseable_page_returns_none(name):
+    assert parse_place_html(UNPARSEABLE_PAGES[name], 1, 'https://example.test') is None
+
+
+def minimal_place_page(name):
+    """Ayrıştırıcının aradığı en küçük gömülü veri; sadece akışı denemek için."""
+    record = [None] * 12
+    record[11] = name
+    payload = ")]}'\n" + json.dumps([None] * 6 + [record])
+    return f"<script>window.APP_INITIALIZATION_STATE={json.dumps([[payload]])};</script>"
+
+
+def test_results_are_persisted_off_the_event_loop():
+    httpx = pytest.importorskip('httpx')
+    from http_engine import fetch_place_details
+
+    def handler(request):
+        if request.url.path.endswith('/hata'):
+            return httpx.Response(503)
+        return httpx.Response(200, text=minimal_place_page('Berber'))
+
+    items = [(1, 'https://maps.test/place/a'), (2, 'https://maps.test/place/hata')]
+    results = []
+    failed = fetch_place_details(
+        items, lambda item, data: results.append((item, data['isim'], threading.current_thread())),
+        transport=httpx.MockTransport(handler), should_stop=lambda: False
+    )
+
+    assert failed == [items[1]]
+    assert [(item, name) for item, name, _ in results] == [(items[0], 'Berber')]
+    assert results[0][2] is not threading.current_thread()
+
+
+def test_unparsed_links_fall_back_to_selenium(monkeypatch, capsys):
+    httpx = pytest.importorskip('httpx')
+    pytest.importorskip('selenium')
+    import scraper
+    from http_engine import fetch_place_details
+
+    pages = {'/maps/place/onay': (200, UNPARSEABLE_PAGES['consent']), '/maps/place/hata': (503, '')}
+
+    def handler(request):
+        status, text = pages[request.url.path]
+        return httpx.Response(status, text=text)
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(
+        scraper, 'http_fetch_details',
+        lambda *args, **kwargs: fetch_place_details(*args, transport=transport, **kwargs)
+    )
+
+    class Job:
+        options = {}
+
+        def update(self, **fields):
+            pass
+
+        def is_cancelled(self):
+            return False
+
+    items = [
+        (1, 'https://www.google.com/maps/place/onay', None),
+        (2, 'https://www.google.com/maps/place/hata', None),
+    ]
+    results = []
+    failed = scraper.engine_detail_phase(Job(), 'http', None, items, results.append)
+
+    # Ayrıştırılamayan ve hata dönen sayfalar Selenium işçilerine kalır
+    assert failed == items
+    assert results == []
+    assert 'motoru hatası' not in capsys.readouterr().out
@@ -0,0 +1,89 @@
+"""
+Google Maps Scraper - Izgara Bölme
+Bir bölgeyi enlem/boylam ızgarasına bölerek her hücre için ayrı
+görünüm (viewport) araması üreten yardımcılar.
+"""
+
+import math
+import re
+
+
+# Maps adreslerindeki görünüm kısmı: /@41.0082,28.9784,13z
+VIEWPORT_RE = re.compile(r'@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?),(\d+(?:\.\d+)?)z')
+
+# Haritanın zoom 0'daki genişliği (piksel)
+TILE_SIZE = 256
+
+# Komşu hücrelerin kenarlarda kalan işletmeleri kaçırmaması için örtüşme oranı
+TILE_OVERLAP = 0.1
+
+MAX_ZOOM = 21
+
+
+def parse_viewport(url):
+    """Maps adresinden (enlem, boylam, zoom) döndürür; yoksa None."""
+    match = VIEWPORT_RE.search(url or '')
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2)), float(match.group(3))
+
+
+def viewport_bounds(lat, lng, zoom, width, height):
+    """
+    Verilen merkez ve zoom'da width x height piksellik haritanın kapsadığı
+    alanı (güney, batı, kuzey, doğu) olarak döndürür.
+    """
+    degrees_per_pixel = 360 / (TILE_SIZE * 2 ** zoom)
+    half_lng = width * degrees_per_pixel / 2
+    half_lat = height * degrees_per_pixel * math.cos(math.radians(lat)) / 2
+    return lat - half_lat, lng - half_lng, lat + half_lat, lng + half_lng
+
+
+def fit_zoom(lat, lat_span, lng_span, width, height):
+    """Verilen enlem/boylam aralığını width x height piksele sığdıran en büyük zoom."""
+    zoom_lng = math.log2(width * 360 / (TILE_SIZE * lng_span))
+    zoom_lat = math.log2(height * 360 * math.cos(math.radians(lat)) / (TILE_SIZE * lat_span))
+    return round(min(MAX_ZOOM, zoom_lng, zoom_lat), 2)
+
+
+def grid_tiles(bounds, grid, width, height):
+    """
+    (güney, batı, kuzey, doğu) alanını grid x grid hücreye böler.
+    Her hücre için görünüm merkezini ve hücreyi kaplayan zoom'u döndürür.
+    """
+    south, west, north, east = bounds
+    lat_step = (north - south) / grid
+    lng_step = (east - west) / grid
+
+    tiles = []
+    for row in range(grid):
+        for col in range(grid):
+            lat = north - (row + 0.5) * lat_step
+            lng = west + (col + 0.5) * lng_step
+            zoom = fit_zoom(
+                lat, lat_step * (1 + TILE_OVERLAP), lng_step * (1 + TILE_OVERLAP), width, height
+            )
+            tiles.append({'lat': round(lat, 6), 'lng': round(lng, 6), 'zoom': zoom})
+    return tiles
+
+
+def parse_bounds(value):
+    """'güney,batı,kuzey,doğu' metnini sayılara çevirir; geçersizse ValueError."""
+    try:
+        parts = [float(part) for part in value.split(',')]
+    except ValueError:
+        raise ValueError("bbox 4 sayı olmalı: güney,batı,kuzey,doğu") from None
+    if len(parts) != 4:
+        raise ValueError("bbox 4 sayı olmalı: güney,batı,kuzey,doğu")
+    south, west, north, east = parts
+    if not (-90 <= south < north <= 90 and -180 <= west < east <= 180):
+        raise ValueError("bbox sınırları geçersiz")
+    return south, west, north, east
+
+
+def tile_url(query, tile):
+    """Hücre görünümünde arama yapan Maps adresi."""
+    return (
+        f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
+        f"/@{tile['lat']},{tile['lng']},{tile['zoom']:g}z"
+    )
@@ -0,0 +1,130 @@
+"""
+Google Maps Scraper - Hazır Olma Beklemeleri
+Sabit time.sleep yerine DOM ve ağ olaylarına göre bekleyen yardımcılar.
+"""
+
+import time
+import threading
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+
+# Feed'e yeni kart eklenene veya liste sonu görünene kadar bekler.
+# MutationObserver ile tetiklenir, polling yapmaz.
+FEED_GROWTH_JS = """
+const feed = arguments[0], previous = arguments[1], timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const count = () => feed.querySelectorAll('a.hfpxzc').length;
+const isEnd = () => {
+    const last = feed.lastElementChild;
+    return !!last && (last.innerText || '').includes('sonuna');
+};
+let finished = false, observer = null, timer = null;
+const finish = (timedOut) => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(timer);
+    done({count: count(), end: isEnd(), timed_out: timedOut});
+};
+const check = () => { if (count() > previous || isEnd()) finish(false); };
+observer = new MutationObserver(check);
+observer.observe(feed, {childList: true, subtree: true});
+timer = setTimeout(() => finish(true), timeoutMs);
+check();
+"""
+
+# Belirtilen süre boyunca yeni kaynak isteği tamamlanmazsa ağı boşta sayar.
+NETWORK_IDLE_JS = """
+const idleMs = arguments[0], timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const start = performance.now();
+let last = start;
+const observer = new PerformanceObserver(() => { last = performance.now(); });
+observer.observe({type: 'resource', buffered: false});
+const tick = () => {
+    const now = performance.now();
+    if (now - last >= idleMs) { observer.disconnect(); done(true); }
+    else if (now - start >= timeoutMs) { observer.disconnect(); done(false); }
+    else setTimeout(tick, 50);
+};
+setTimeout(tick, 50);
+"""
+
+
+class AdaptiveTimeout:
+    """
+    Gözlenen bekleme sürelerine göre kendini ayarlayan zaman aşımı.
+    Başarılı beklemelerin hareketli ortalamasının katı kadar bekler,
+    zaman aşımı olursa süreyi büyütür.
+    """
+
+    def __init__(self, initial, minimum, maximum, factor=3.0, alpha=0.3):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.alpha = alpha
+        self.current = initial
+        self._average = None
+        self._lock = threading.Lock()
+
+    def record(self, duration, timed_out=False):
+        """Bir beklemenin sonucunu kaydeder ve zaman aşımını günceller."""
+        with self._lock:
+            if timed_out:
+                self.current = min(self.maximum, self.current * 1.5)
+                return
+            if self._average is None:
+                self._average = duration
+            else:
+                self._average = self.alpha * duration + (1 - self.alpha) * self._average
+            self.current = min(self.maximum, max(self.minimum, self._average * self.factor))
+
+
+def wait_for_feed_growth(driver, feed, previous_count, timeout):
+    """
+    Feed'deki yer kartı sayısı previous_count'u geçene veya
+    liste sonu görünene kadar bekler.
+    Dönen sözlük: count, end, timed_out, elapsed
+    """
+    started = time.time()
+    try:
+        result = driver.execute_async_script(
+            FEED_GROWTH_JS, feed, previous_count, int(timeout * 1000)
+        ) or {}
+    except Exception:
+        result = {}
+    return {
+        'count': result.get('count', previous_count),
+        'end': bool(result.get('end')),
+        'timed_out': result.get('timed_out', True),
+        'elapsed': time.time() - started
+    }
+
+
+def wait_for_network_idle(driver, idle=0.5, timeout=5):
+    """Sayfada idle saniye boyunca yeni ağ isteği bitmeyene kadar bekler."""
+    try:
+        return bool(driver.execute_async_script(
+            NETWORK_IDLE_JS, int(idle * 1000), int(timeout * 1000)
+        ))
+    except Exception:
+        return False
+
+
+def wait_for_place_details(driver, timeout):
+    """
+    İşletme sayfasında başlık ve bilgi butonları (adres, telefon vb.)
+    oluşana kadar bekler. Geçen süreyi ve zaman aşımı olup olmadığını döndürür.
+    """
+    started = time.time()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "[data-item-id]"))
+        )
+        timed_out = False
+    except Exception:
+        timed_out = True
+    return time.time() - started, timed_out
@@ -1,17 +1,21 @@
 ﻿"""
 Google Maps Scraper - Production Ready Flask App
 Sunucu için optimize edilmiş web uygulaması
+
+Açılışta yalnızca Flask ve SQLite depoları yüklenir. Tarama motoru
+(Selenium, HTTP/CDP motorları) ilk işte, dışa aktarıcılar (openpyxl)
+ilk dışa aktarmada yüklenir. Gunicorn --preload ile kullanılabilir.
 """
 
 import os
-import re
 import json
 import time
-import threading
-from io import BytesIO, StringIO
-import csv
+import uuid
 
-from flask import Flask, jsonify, request, render_template_string, send_file, Response
+from flask import (
+    Blueprint, Flask, jsonify, request, render_template_string, send_file, Response,
+    stream_with_context
+)
 
 # .env desteği (isteğe bağlı)
 try:
@@ -20,308 +24,53 @@ try:
 except ImportError:
     pass
 
-# Selenium Importları
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-# Excel Importları
-try:
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    EXCEL_AVAILABLE = True
-except ImportError:
-    EXCEL_AVAILABLE = False
-
-# Flask Uygulaması
-app = Flask(__name__)
-app.secret_key = os.getenv('FLASK_SECRET_KEY', 'google_maps_scraper_2026')
-application = app  # WSGI sunucuları (Gunicorn) için alias
+from stores import cache_mode, job_store, place_index, query_cache
+from jobs import JobScheduler
+from metrics import EXPORT, REGISTRY, timed
+from batch import dedupe_places, parse_queries, read_queries
+from tiling import parse_bounds
 
 # --- GLOBAL DEĞİŞKENLER ---
-scraping_status = {
-    'is_running': False,
-    'progress': 0,
-    'message': 'Hazır',
-    'results': [],
-    'total_found': 0,
-    'location': '',
-    'profession': ''
-}
 
+# Aynı anda çalışabilecek toplam iş sayısı (tüm Gunicorn worker'ları için)
+MAX_CONCURRENT_JOBS = max(1, int(os.getenv('MAX_CONCURRENT_JOBS', 2)))
 
-# --- YARDIMCI FONKSİYONLAR ---
+# Kuyruk sıralaması: 'priority' (öncelik, sonra FIFO) veya 'fifo'
+JOB_SCHEDULING = os.getenv('JOB_SCHEDULING', 'priority')
 
-def get_chrome_driver():
-    """
-    Chrome WebDriver oluşturur.
-    Sunucu (Linux) ve yerel (Windows) ortamlar için uyumludur.
-    """
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--lang=tr-TR")
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    
-    # Linux sunucu için ChromeDriver yolu
-    linux_chromedriver_path = '/usr/bin/chromedriver'
-    
-    if os.path.exists(linux_chromedriver_path):
-        # Linux sunucu
-        service = Service(linux_chromedriver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-    else:
-        # Windows veya webdriver-manager kullan
-        try:
-            from webdriver_manager.chrome import ChromeDriverManager
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        except Exception:
-            # Sistem PATH'inden Chrome kullan
-            driver = webdriver.Chrome(options=chrome_options)
-    
-    return driver
+# Arama modları:
+# - detail: her işletmenin sayfası açılır (varsayılan)
+# - list:   sadece liste kartlarındaki veriler döner, sayfa açılmaz
+# - hybrid: sadece telefonu veya websitesi kartta olmayan işletmelerin sayfası açılır
+SCRAPE_MODES = ('detail', 'list', 'hybrid')
 
+# Detay sayfası motorları:
+# - selenium: her sayfa tarayıcıda açılır (varsayılan)
+# - http: sayfalar tarayıcısız HTTP ile çekilir, ayrıştırılamayanlar tarayıcıya kalır
+# - cdp: sayfalar tek tarayıcıda DevTools protokolüyle çok sekmede eşzamanlı çekilir
+DETAIL_ENGINES = ('selenium', 'http', 'cdp')
 
-def analyze_phone_number(phone):
-    """Telefon numarasını analiz eder ve WhatsApp linki oluşturur."""
-    if not phone:
-        return {'is_mobile': False, 'formatted': '', 'whatsapp_link': '', 'display': ''}
-    
-    cleaned = re.sub(r'[^\d]', '', phone)
-    is_mobile = False
-    whatsapp_number = ''
-    
-    # Türkiye numarası kontrolü
-    if cleaned.startswith('90'):
-        if len(cleaned) >= 12 and cleaned[2] == '5':
-            is_mobile = True
-            whatsapp_number = cleaned[:12]
-    elif cleaned.startswith('05'):
-        if len(cleaned) >= 11:
-            is_mobile = True
-            whatsapp_number = '9' + cleaned[:11]
-    elif cleaned.startswith('5'):
-        if len(cleaned) >= 10:
-            is_mobile = True
-            whatsapp_number = '90' + cleaned[:10]
-    
-    whatsapp_link = f"https://wa.me/{whatsapp_number}" if is_mobile and whatsapp_number else ''
-    
-    return {
-        'is_mobile': is_mobile,
-        'formatted': cleaned,
-        'whatsapp_link': whatsapp_link,
-        'display': phone
-    }
-
-
-def extract_detailed_data(driver, index, link):
-    """Tekil işletme detaylarını çeker."""
-    result = {
-        'sira': index,
-        'isim': '',
-        'puan': '',
-        'degerlendirme_sayisi': '',
-        'kategori': '',
-        'adres': '',
-        'telefon': '',
-        'telefon_bilgi': {},
-        'website': '',
-        'calisma_saatleri': {},
-        'calisma_durumu': '',
-        'plus_code': '',
-        'link': link
-    }
-    
-    try:
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "h1, div.fontHeadlineLarge"))
-        )
-        time.sleep(1)
-        
-        # İsim
-        try:
-            name_elem = driver.find_element(By.TAG_NAME, "h1")
-            result['isim'] = name_elem.text.strip()
-        except Exception:
-            pass
+# /events akışının iş deposunu yoklama aralığı (saniye)
+SSE_POLL_INTERVAL = float(os.getenv('SSE_POLL_INTERVAL', 0.5))
 
-        # Puan
-        try:
-            puan_elem = driver.find_element(By.CSS_SELECTOR, "div.F7nice span[aria-hidden='true']")
-            result['puan'] = puan_elem.text.strip()
-        except Exception:
-            pass
+# Izgara modunda kenar başına en fazla hücre sayısı (grid=4 -> 16 arama)
+MAX_GRID_SIZE = max(1, int(os.getenv('MAX_GRID_SIZE', 8)))
 
-        # Değerlendirme sayısı
-        try:
-            yorum_elem = driver.find_element(By.CSS_SELECTOR, "div.F7nice span[aria-label*='yorum']")
-            text = yorum_elem.get_attribute("aria-label")
-            match = re.search(r'([\d.,]+)', text) if text else None
-            result['degerlendirme_sayisi'] = match.group(1) if match else ''
-        except Exception:
-            pass
-
-        # Adres
-        try:
-            addr_btn = driver.find_element(By.CSS_SELECTOR, "button[data-item-id='address']")
-            label = addr_btn.get_attribute("aria-label")
-            result['adres'] = label.replace("Adres:", "").strip() if label else ''
-        except Exception:
-            pass
+# Tek bir toplu aramada (/batch) en fazla sorgu sayısı
+MAX_BATCH_QUERIES = max(1, int(os.getenv('MAX_BATCH_QUERIES', 500)))
 
-        # Telefon
-        try:
-            phone_btn = driver.find_element(By.CSS_SELECTOR, "button[data-item-id^='phone']")
-            label = phone_btn.get_attribute("aria-label")
-            raw_phone = label.replace("Telefon:", "").strip() if label else ''
-            result['telefon'] = raw_phone
-            result['telefon_bilgi'] = analyze_phone_number(raw_phone)
-        except Exception:
-            pass
-
-        # Website
-        try:
-            web_btn = driver.find_element(By.CSS_SELECTOR, "a[data-item-id='authority']")
-            result['website'] = web_btn.get_attribute("href")
-        except Exception:
-            pass
 
-        return result
+def run_job(job):
+    """Kuyruktan alınan işi çalıştırır. Tarama motoru bu süreçteki ilk işte yüklenir."""
+    from scraper import scrape_task
+    scrape_task(job)
 
-    except Exception as e:
-        print(f"Veri çekme hatası (Index {index}): {e}")
-        return result
 
+# Kuyruktaki işleri bu süreçte çalıştıran zamanlayıcı
+scheduler = JobScheduler(job_store, run_job, MAX_CONCURRENT_JOBS, JOB_SCHEDULING)
 
-def scrape_task(location, profession, max_results):
-    """Arka planda çalışacak ana scraping fonksiyonu."""
-    global scraping_status
-    
-    scraping_status['is_running'] = True
-    scraping_status['progress'] = 0
-    scraping_status['message'] = 'Tarayıcı hazırlanıyor...'
-    scraping_status['results'] = []
-    
-    driver = None
-    try:
-        driver = get_chrome_driver()
-        scraping_status['message'] = 'Google Maps açılıyor...'
-        
-        search_query = f"{location} {profession}"
-        url = f"https://www.google.com/maps/search/{search_query.replace(' ', '+')}"
-        
-        driver.get(url)
-        scraping_status['progress'] = 10
-        
-        # Çerez onayı (varsa geç)
-        try:
-            WebDriverWait(driver, 3).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Kabul')]"))
-            ).click()
-        except Exception:
-            pass
-            
-        scraping_status['message'] = 'Liste yükleniyor...'
-        
-        # Listeyi bekle
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']"))
-            )
-        except Exception:
-            scraping_status['message'] = 'Sonuç bulunamadı.'
-            scraping_status['is_running'] = False
-            return
-
-        scrollable_div = driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
-        place_links = []
-        
-        # Link toplama döngüsü
-        scroll_attempts = 0
-        max_scroll_attempts = 30
-        
-        while len(place_links) < max_results and scroll_attempts < max_scroll_attempts:
-            elements = driver.find_elements(By.CSS_SELECTOR, "a.hfpxzc")
-            for elem in elements:
-                href = elem.get_attribute("href")
-                if href and href not in place_links:
-                    place_links.append(href)
-            
-            scraping_status['message'] = f"{len(place_links)} işletme bulundu..."
-            
-            driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_div)
-            time.sleep(2)
-            
-            if "sonuna" in driver.page_source or len(place_links) >= max_results:
-                break
-            
-            scroll_attempts += 1
-        
-        place_links = place_links[:max_results]
-        
-        # Detayları çekme döngüsü
-        results = []
-        total = len(place_links)
-        
-        for i, link in enumerate(place_links):
-            if not scraping_status['is_running']:
-                break
-                
-            scraping_status['message'] = f"Veri çekiliyor: {i+1}/{total}"
-            scraping_status['progress'] = 20 + int((i / total) * 80)
-            
-            driver.get(link)
-            data = extract_detailed_data(driver, i+1, link)
-            
-            if data['isim']:
-                results.append(data)
-                scraping_status['results'] = results.copy()
-                
-        scraping_status['message'] = 'Tamamlandı!'
-        scraping_status['progress'] = 100
-        scraping_status['results'] = results
-        scraping_status['total_found'] = len(results)
-        
-        # Sonuçları JSON dosyasına kaydet
-        save_results(results, location, profession)
-
-    except Exception as e:
-        scraping_status['message'] = f"Hata oluştu: {str(e)}"
-    finally:
-        scraping_status['is_running'] = False
-        if driver:
-            driver.quit()
-
-
-def save_results(results, location, profession):
-    """Sonuçları JSON dosyasına kaydet."""
-    try:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        filename = f"sonuclar_{location}_{profession}.json".replace(' ', '_').lower()
-        filepath = os.path.join(base_dir, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
-        
-        # Genel sonuçlar dosyası
-        general_filepath = os.path.join(base_dir, 'son_arama.json')
-        with open(general_filepath, 'w', encoding='utf-8') as f:
-            json.dump({
-                'lokasyon': location,
-                'meslek': profession,
-                'sonuc_sayisi': len(results),
-                'sonuclar': results
-            }, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print(f"Sonuçlar kaydedilirken hata: {e}")
+# Rotalar; uygulama create_app ile oluşturulur
+routes = Blueprint('routes', __name__)
 
 
 # --- HTML TEMPLATE ---
@@ -344,15 +93,22 @@ HTML_TEMPLATE = """
             <div class="card-body">
                 <form id="searchForm">
                     <div class="row g-3">
-                        <div class="col-md-5">
+                        <div class="col-md-4">
                             <input type="text" class="form-control" name="location" placeholder="Konum (Örn: Kadıköy)" required>
                         </div>
-                        <div class="col-md-5">
+                        <div class="col-md-4">
                             <input type="text" class="form-control" name="profession" placeholder="Meslek (Örn: Berber)" required>
                         </div>
                         <div class="col-md-2">
                             <input type="number" class="form-control" name="max_results" value="10" min="1" max="100">
                         </div>
+                        <div class="col-md-2">
+                            <select class="form-select" name="mode">
+                                <option value="detail">Detaylı</option>
+                                <option value="hybrid">Hibrit</option>
+                                <option value="list">Hızlı (liste)</option>
+                            </select>
+                        </div>
                     </div>
                     <button type="submit" class="btn btn-success mt-3 w-100">🚀 Scraping Başlat</button>
                 </form>
@@ -379,27 +135,40 @@ HTML_TEMPLATE = """
 
     <script>
         $(document).ready(function(){
+            var jobId = null;
+
             $('#searchForm').on('submit', function(e){
                 e.preventDefault();
                 $('#dlExcel').addClass('disabled');
                 $('#dlCsv').addClass('disabled');
                 $.post('/search', $(this).serialize(), function(data){
+                    jobId = data.job_id;
+                    $('#dlExcel').attr('href', '/export/excel?job_id=' + jobId);
+                    $('#dlCsv').attr('href', '/export/csv?job_id=' + jobId);
                     $('#statusArea').show();
-                    checkStatus();
+                    listen();
                 }).fail(function(xhr){
                     alert(xhr.responseJSON ? xhr.responseJSON.error : 'Bir hata oluştu');
                 });
             });
 
-            function checkStatus(){
-                $.get('/status', function(data){
+            function listen(){
+                var source = new EventSource('/events/' + jobId);
+
+                source.addEventListener('progress', function(e){
+                    var data = JSON.parse(e.data);
+                    if('message' in data) $('#statusText').text(data.message);
+                    if('progress' in data) $('#progressBar').css('width', data.progress + '%');
+                    if('total_found' in data) $('#foundCount').text(data.total_found);
+                });
+
+                source.addEventListener('done', function(e){
+                    var data = JSON.parse(e.data);
+                    source.close();
                     $('#statusText').text(data.message);
                     $('#progressBar').css('width', data.progress + '%');
                     $('#foundCount').text(data.total_found);
-                    
-                    if(data.is_running){
-                        setTimeout(checkStatus, 2000);
-                    } else if(data.progress == 100) {
+                    if(data.total_found > 0) {
                         $('#dlExcel').removeClass('disabled');
                         $('#dlCsv').removeClass('disabled');
                     }
@@ -414,139 +183,442 @@ HTML_TEMPLATE = """
 
 # --- FLASK ROUTE'LARI ---
 
-@app.route('/')
+@routes.route('/')
 def home():
     """Ana sayfa."""
     return render_template_string(HTML_TEMPLATE)
 
 
-@app.route('/api')
+@routes.before_app_request
+def start_scheduler():
+    """Bu süreçteki iş zamanlayıcısının çalıştığından emin ol."""
+    scheduler.ensure_started()
+
+
+@routes.route('/api')
 def api_home():
     """API durumu."""
     return jsonify({
         "status": "ok",
         "message": "Google Maps Scraper API çalışıyor 👑",
-        "endpoints": ["/", "/search", "/status", "/export/excel", "/export/csv"]
+        "endpoints": [
+            "/", "/search", "/batch", "/batch/<batch_id>", "/status", "/status/<job_id>", "/results/<job_id>",
+            "/events/<job_id>", "/cancel/<job_id>", "/jobs", "/places", "/export/excel", "/export/csv",
+            "/metrics"
+        ]
     })
 
 
-@app.route('/search', methods=['POST'])
+def int_param(values, name, default):
+    """Tam sayı alanını okur; boşsa default, sayı değilse Türkçe mesajlı ValueError."""
+    value = values.get(name)
+    if value is None or not str(value).strip():
+        return default
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{name} bir tam sayı olmalı") from None
+
+
+def read_search_options(values):
+    """
+    Arama ayarlarını form veya JSON alanlarından okur ve doğrular.
+    Dönen değer: (options, max_results, priority, max_age). Hatalı alanda ValueError.
+    """
+    max_results = int_param(values, 'max_results', 20)
+    priority = int_param(values, 'priority', 0)
+    mode = str(values.get('mode') or 'detail').strip().lower()
+    refresh = str(values.get('refresh') or '').lower() in ('1', 'true', 'on')
+    max_age = int_param(values, 'max_staleness', None)
+    grid = int_param(values, 'grid', 0)
+    bbox = str(values.get('bbox') or '').strip()
+    engine = str(values.get('engine') or '').strip().lower()
+
+    if mode not in SCRAPE_MODES:
+        raise ValueError(f"Geçersiz mod. Seçenekler: {', '.join(SCRAPE_MODES)}")
+    if not 0 <= grid <= MAX_GRID_SIZE:
+        raise ValueError(f"grid 0 ile {MAX_GRID_SIZE} arasında olmalı")
+    if engine and engine not in DETAIL_ENGINES:
+        raise ValueError(f"Geçersiz motor. Seçenekler: {', '.join(DETAIL_ENGINES)}")
+
+    options = {'mode': mode, 'refresh': refresh}
+    if engine:
+        options['engine'] = engine
+    if grid:
+        options['grid'] = grid
+        if bbox:
+            options['bbox'] = list(parse_bounds(bbox))
+
+    return options, max_results, priority, max_age
+
+
+def submit_search(location, profession, max_results, priority, options, max_age=None, batch_id=None):
+    """
+    Aramayı kuyruğa ekler. Aynı arama yakın zamanda yapıldıysa iş
+    önbellekteki sonuçla tamamlanmış olarak oluşturulur.
+    Dönen değer: (job_id, önbellekten mi)
+    """
+    if not options.get('refresh'):
+        cached_job = query_cache.get(location, profession, cache_mode(options), max_results, max_age)
+        if cached_job is not None:
+            job_id = job_store.create_done(
+                location, profession, max_results, cached_job, 'Tamamlandı! (önbellekten)',
+                options, batch_id
+            )
+            if job_id:
+                return job_id, True
+
+    job_id = job_store.create(location, profession, max_results, priority, options, batch_id)
+    scheduler.notify()
+    return job_id, False
+
+
+@routes.route('/search', methods=['POST'])
 def search():
-    """Arama başlat."""
-    global scraping_status
-    
-    if scraping_status['is_running']:
-        return jsonify({'error': 'Şu anda zaten bir işlem devam ediyor.'}), 400
-    
+    """Arama işini kuyruğa ekle. ?resume=<job_id> yarım kalan işi devam ettirir."""
+    resume_id = request.values.get('resume', '').strip()
+    if resume_id:
+        if not job_store.resume(resume_id):
+            return jsonify({'error': 'İş bulunamadı veya devam ettirilemez'}), 404
+        scheduler.notify()
+        return jsonify({
+            'success': True,
+            'message': 'İş kaldığı yerden devam edecek',
+            'job_id': resume_id,
+            'resumed': True,
+            'queue_position': job_store.queue_position(resume_id)
+        })
+
     location = request.form.get('location', '').strip()
     profession = request.form.get('profession', '').strip()
-    max_results = int(request.form.get('max_results', 20))
     
     if not location or not profession:
         return jsonify({'error': 'Lokasyon ve meslek alanları zorunludur!'}), 400
+    try:
+        options, max_results, priority, max_age = read_search_options(request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    scraping_status['location'] = location
-    scraping_status['profession'] = profession
-    
-    thread = threading.Thread(target=scrape_task, args=(location, profession, max_results))
-    thread.daemon = True
-    thread.start()
+    job_id, cached = submit_search(location, profession, max_results, priority, options, max_age)
+    if cached:
+        return jsonify({
+            'success': True,
+            'message': 'Sonuçlar önbellekten alındı',
+            'job_id': job_id,
+            'cached': True,
+            'queue_position': 0
+        })
     
-    return jsonify({'success': True, 'message': 'İşlem başlatıldı'})
+    return jsonify({
+        'success': True,
+        'message': 'İş kuyruğa alındı',
+        'job_id': job_id,
+        'queue_position': job_store.queue_position(job_id)
+    })
+
+
+@routes.route('/batch', methods=['POST'])
+def batch_search():
+    """
+    Çok sayıda lokasyon x meslek aramasını tek istekte kuyruğa ekle.
+    Sorgular JSON gövdesindeki 'queries' listesinde veya yüklenen
+    CSV/JSON dosyasında ('file') verilir; diğer alanlar /search ile aynıdır.
+    """
+    payload = request.get_json(silent=True)
+    try:
+        if isinstance(payload, list):
+            values, queries = {}, parse_queries(payload)
+        elif isinstance(payload, dict):
+            values, queries = payload, parse_queries(payload.get('queries') or [])
+        else:
+            values = request.form
+            upload = request.files.get('file')
+            queries = read_queries(upload.read().decode('utf-8-sig'), upload.filename or '') if upload else []
+        options, max_results, priority, max_age = read_search_options(values)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not queries:
+        return jsonify({'error': 'Sorgu listesi boş'}), 400
+    if len(queries) > MAX_BATCH_QUERIES:
+        return jsonify({'error': f"En fazla {MAX_BATCH_QUERIES} sorgu gönderilebilir"}), 400
+
+    batch_id = uuid.uuid4().hex[:12]
+    jobs = []
+    for location, profession in queries:
+        job_id, cached = submit_search(
+            location, profession, max_results, priority, options, max_age, batch_id
+        )
+        jobs.append({'job_id': job_id, 'location': location, 'profession': profession, 'cached': cached})
+
+    return jsonify({
+        'success': True,
+        'message': f"{len(jobs)} arama kuyruğa alındı",
+        'batch_id': batch_id,
+        'count': len(jobs),
+        'cached': sum(1 for job in jobs if job['cached']),
+        'jobs': jobs
+    })
+
+
+@routes.route('/batch/<batch_id>')
+def batch_status(batch_id):
+    """Toplu aramanın genel durumunu ve işlerinin özetini döndür."""
+    jobs = job_store.batch_jobs(batch_id)
+    if not jobs:
+        return jsonify({'error': 'Toplu arama bulunamadı'}), 404
 
+    statuses = {}
+    for job in jobs:
+        statuses[job['status']] = statuses.get(job['status'], 0) + 1
 
-@app.route('/status')
+    return jsonify({
+        'batch_id': batch_id,
+        'total': len(jobs),
+        'statuses': statuses,
+        'is_running': any(job['is_running'] for job in jobs),
+        'progress': sum(job['progress'] for job in jobs) // len(jobs),
+        'total_found': sum(job['total_found'] for job in jobs),
+        'jobs': [
+            {key: job[key] for key in ('id', 'location', 'profession', 'status', 'progress',
+                                       'message', 'total_found')}
+            for job in jobs
+        ]
+    })
+
+
+@routes.route('/status')
 def status():
-    """Scraping durumunu döndür."""
-    return jsonify(scraping_status)
+    """En son işin özet durumunu döndür (eski arayüzlerle uyumluluk için)."""
+    job = job_store.latest()
+    if not job:
+        return jsonify({'is_running': False, 'progress': 0, 'message': 'Hazır', 'total_found': 0})
+    return jsonify(job)
+
+
+@routes.route('/status/<job_id>')
+def job_status(job_id):
+    """Verilen işin özet durumunu döndür. Sonuçlar için /results kullanılır."""
+    job = job_store.get(job_id)
+    if not job:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    job['queue_position'] = job_store.queue_position(job_id)
+    return jsonify(job)
+
+
+@routes.route('/results/<job_id>')
+def job_results(job_id):
+    """İşin sonuçlarını sayfalı olarak (geliş sırasıyla) döndür."""
+    job = job_store.get(job_id)
+    if not job:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    try:
+        offset = max(0, int_param(request.args, 'offset', 0))
+        limit = min(1000, max(1, int_param(request.args, 'limit', 100)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'job_id': job_id,
+        'offset': offset,
+        'limit': limit,
+        'total': job['total_found'],
+        'results': job_store.get_results(job_id, offset, limit)
+    })
+
+
+def sse_message(event, data, event_id=None):
+    """Tek bir Server-Sent Events mesajı oluşturur."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
 
+@routes.route('/events/<job_id>')
+def job_events(job_id):
+    """
+    İşin ilerlemesini Server-Sent Events olarak yayınla.
+    - progress: değişen durum alanları
+    - result:   yeni eklenen her sonuç (id = o ana kadarki sonuç sayısı)
+    - done:     iş bittiğinde son durum
+    """
+    if not job_store.get(job_id):
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    try:
+        offset = max(0, int_param(request.headers, 'Last-Event-ID', None)
+                     or int_param(request.args, 'offset', 0))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def stream():
+        sent = offset
+        last = {}
+        last_write = time.time()
+        while True:
+            job = job_store.get(job_id)
+            if job is None:
+                return
+
+            delta = {key: value for key, value in job.items() if last.get(key) != value}
+            delta.pop('updated_at', None)
+            if delta:
+                yield sse_message('progress', delta)
+                last_write = time.time()
+            last = job
+
+            if job['total_found'] > sent:
+                for row in job_store.get_results(job_id, sent):
+                    sent += 1
+                    yield sse_message('result', row, event_id=sent)
+                last_write = time.time()
+
+            if not job['is_running']:
+                yield sse_message('done', job)
+                return
+
+            # Proxy'lerin bağlantıyı kapatmaması için ara sıra yorum satırı gönder
+            if time.time() - last_write > 15:
+                yield ": ping\n\n"
+                last_write = time.time()
+            time.sleep(SSE_POLL_INTERVAL)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@routes.route('/cancel/<job_id>', methods=['POST'])
+def cancel_job(job_id):
+    """Bekleyen veya çalışan bir işi iptal et."""
+    if not job_store.cancel(job_id):
+        return jsonify({'error': 'İş bulunamadı veya zaten bitmiş'}), 404
+    return jsonify({'success': True, 'message': 'İptal isteği alındı'})
+
+
+def read_index_filters(args):
+    """Ana indeks filtrelerini sorgu parametrelerinden okur."""
+    filters = {key: args.get(key, '').strip() for key in ('location', 'profession', 'q', 'phone', 'website')}
+    for key in ('has_phone', 'has_website'):
+        filters[key] = args.get(key, '').lower() in ('1', 'true', 'on')
+    if args.get('min_rating'):
+        filters['min_rating'] = float(args['min_rating'].replace(',', '.'))
+    if args.get('days'):
+        filters['since'] = time.time() - float(args['days']) * 86400
+    return filters
+
+
+@routes.route('/places')
+def list_places():
+    """
+    Ana işletme indeksini filtreleyip sayfalı döndür.
+    Filtreler: location, profession, q (isim), phone, website,
+    has_phone, has_website, min_rating, days (son N günde görülenler)
+    """
+    try:
+        filters = read_index_filters(request.args)
+    except ValueError:
+        return jsonify({'error': 'Geçersiz filtre değeri'}), 400
+    try:
+        offset = max(0, int_param(request.args, 'offset', 0))
+        limit = min(1000, max(1, int_param(request.args, 'limit', 100)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'offset': offset,
+        'limit': limit,
+        'total': place_index.count(**filters),
+        'results': list(place_index.iter_places(offset, limit, **filters))
+    })
 
-@app.route('/export/<fmt>')
+
+@routes.route('/jobs')
+def list_jobs():
+    """Son işleri listele."""
+    try:
+        limit = int_param(request.args, 'limit', 50)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(job_store.recent(limit))
+
+
+@routes.route('/metrics')
+def metrics_endpoint():
+    """
+    Bu sürecin metrikleri (Prometheus metin biçimi).
+    Gunicorn'da her worker kendi sayaçlarını tutar.
+    """
+    return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def timed_export(chunks, fmt):
+    """Akışlı dışa aktarmanın süresini akış bitince kaydeder."""
+    with timed(EXPORT, format=fmt):
+        yield from chunks
+
+
+@routes.route('/export/<fmt>')
 def export_data(fmt):
-    """Excel veya CSV olarak dışa aktar."""
-    global scraping_status
-    results = scraping_status.get('results', [])
-    
-    if not results:
-        return jsonify({"error": "İndirilecek veri yok"}), 404
-        
-    location = scraping_status.get('location', 'bilinmiyor')
-    profession = scraping_status.get('profession', 'bilinmiyor')
-    filename_base = f"sonuclar_{location}_{profession}".replace(' ', '_')
-    
-    if fmt == 'excel':
-        if not EXCEL_AVAILABLE:
-            return jsonify({"error": "openpyxl kütüphanesi yüklü değil. CSV olarak indirin."}), 400
-            
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Sonuclar"
+    """
+    Excel veya CSV olarak dışa aktar.
+    ?job_id= tek iş, ?batch_id= toplu arama, ?source=index ana indeks
+    (/places ile aynı filtrelerle).
+    """
+    batch_id = request.args.get('batch_id')
+    if request.args.get('source') == 'index':
+        try:
+            filters = read_index_filters(request.args)
+        except ValueError:
+            return jsonify({"error": "Geçersiz filtre değeri"}), 400
+        if not place_index.count(**filters):
+            return jsonify({"error": "İndirilecek veri yok"}), 404
         
-        headers = ['Sıra', 'İşletme Adı', 'Puan', 'Yorum Sayısı', 'Adres', 'Telefon', 'Tip', 'WhatsApp', 'Website', 'Link']
-        ws.append(headers)
+        results = place_index.iter_places(**filters)
+        filename_base = "ana_indeks"
+    elif batch_id:
+        jobs = job_store.batch_jobs(batch_id)
+        if not sum(job['total_found'] for job in jobs):
+            return jsonify({"error": "İndirilecek veri yok"}), 404
         
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
+        # Sorgular arasında tekrar eden işletmeler tek satıra indirilir
+        results = dedupe_places(job_store.iter_batch_results(batch_id))
+        filename_base = f"toplu_sonuclar_{batch_id}"
+    else:
+        job_id = request.args.get('job_id')
+        job = job_store.get(job_id) if job_id else job_store.latest()
         
-        for cell in ws[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            
-        for item in results:
-            tel_bilgi = item.get('telefon_bilgi', {})
-            row = [
-                item.get('sira'),
-                item.get('isim'),
-                item.get('puan'),
-                item.get('degerlendirme_sayisi'),
-                item.get('adres'),
-                item.get('telefon'),
-                'Cep' if tel_bilgi.get('is_mobile') else 'Sabit',
-                tel_bilgi.get('whatsapp_link', ''),
-                item.get('website', ''),
-                item.get('link', '')
-            ]
-            ws.append(row)
+        if not job or not job['total_found']:
+            return jsonify({"error": "İndirilecek veri yok"}), 404
         
-        # Sütun genişlikleri
-        column_widths = [6, 35, 8, 12, 40, 18, 8, 30, 35, 50]
-        for i, width in enumerate(column_widths, 1):
-            ws.column_dimensions[chr(64 + i)].width = width
+        # Sonuçlar depodan sıra numarasına göre tek tek okunur
+        results = job_store.iter_results(job['id'])
             
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
+        location = job.get('location') or 'bilinmiyor'
+        profession = job.get('profession') or 'bilinmiyor'
+        filename_base = f"sonuclar_{location}_{profession}".replace(' ', '_')
+    
+    # Dışa aktarıcılar (openpyxl) ilk dışa aktarmada yüklenir
+    from exporters import EXCEL_AVAILABLE, build_excel, csv_stream
+
+    if fmt == 'excel':
+        if not EXCEL_AVAILABLE:
+            return jsonify({"error": "openpyxl kütüphanesi yüklü değil. CSV olarak indirin."}), 400
         
+        with timed(EXPORT, format='excel'):
+            workbook = build_excel(results)
         return send_file(
-            output, 
+            workbook,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             download_name=f"{filename_base}.xlsx", 
             as_attachment=True
         )
         
     elif fmt == 'csv':
-        output = StringIO()
-        writer = csv.writer(output, delimiter=';')
-        writer.writerow(['Sıra', 'İşletme Adı', 'Puan', 'Yorum Sayısı', 'Adres', 'Telefon', 'Tip', 'WhatsApp', 'Website', 'Link'])
-        
-        for item in results:
-            tel_bilgi = item.get('telefon_bilgi', {})
-            writer.writerow([
-                item.get('sira'),
-                item.get('isim'),
-                item.get('puan'),
-                item.get('degerlendirme_sayisi'),
-                item.get('adres'),
-                item.get('telefon'),
-                'Cep' if tel_bilgi.get('is_mobile') else 'Sabit',
-                tel_bilgi.get('whatsapp_link', ''),
-                item.get('website', ''),
-                item.get('link', '')
-            ])
-            
-        output.seek(0)
         return Response(
-            output.getvalue(),
+            stream_with_context(timed_export(csv_stream(results), 'csv')),
             mimetype="text/csv",
             headers={"Content-disposition": f"attachment; filename={filename_base}.csv"}
         )
@@ -554,6 +626,23 @@ def export_data(fmt):
     return jsonify({"error": "Geçersiz format"}), 400
 
 
+# --- UYGULAMA ---
+
+def create_app():
+    """
+    Flask uygulamasını oluşturur (Gunicorn: "web_app:create_app()").
+    İş kuyruğu ve depolar süreç genelinde ortaktır.
+    """
+    flask_app = Flask(__name__)
+    flask_app.secret_key = os.getenv('FLASK_SECRET_KEY', 'google_maps_scraper_2026')
+    flask_app.register_blueprint(routes)
+    return flask_app
+
+
+app = create_app()
+application = app  # WSGI sunucuları (Gunicorn) için alias
+
+
 # --- UYGULAMA BAŞLATMA ---
 if __name__ == '__main__':
     # Production için debug=False